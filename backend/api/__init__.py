@@ -5,4 +5,4 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
-from api import models
+from api import models, signals, sessions, http_cache, events
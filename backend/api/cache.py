@@ -0,0 +1,149 @@
+"""
+In-Process Caches
+
+Small thread-safe TTL caches for read-heavy endpoints, with hit/miss counters.
+Each worker process has its own copy; entries are dropped when the data they
+depend on changes in this process, and expire after their TTL so writes made
+by other workers show up within that bound.
+"""
+import threading
+import time
+
+
+# All caches by name, for the admin metrics endpoint
+caches = {}
+
+
+class TTLCache:
+    """
+    Dict-like cache with per-entry expiry and a generation counter.
+
+    `clear()` bumps the generation; a value computed before the clear is not
+    stored (see `set`), so a slow reader cannot re-cache data that was just
+    invalidated.
+    """
+
+    def __init__(self, name, max_entries=256):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl, generation=None):
+        """
+        Store `value` for `ttl` seconds.
+        If `generation` is given and the cache was cleared since, the value is discarded.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations
+            }
+
+
+class VersionedSnapshot:
+    """
+    A whole small table held in memory, revalidated by a cheap version stamp.
+
+    `load()` builds the snapshot and `stamp()` returns a value that changes
+    whenever the table does (e.g. row count and latest update time). Within
+    `check_interval` seconds of the last check the snapshot is served as-is;
+    after that one stamp query decides whether to reload it, so writes made
+    by other workers show up within that bound. Writers in this process call
+    `clear()` after committing.
+    """
+
+    def __init__(self, name, load, stamp):
+        self.name = name
+        self._load = load
+        self._stamp = stamp
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = 0.0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def get(self, check_interval):
+        """Return the snapshot, reloading it if missing or its stamp changed."""
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and now - self._checked_at < check_interval:
+                self.hits += 1
+                return self._value
+            value, generation = self._value, self.generation
+
+        version = self._stamp()
+        if value is not None and version == self._version:
+            with self._lock:
+                if generation == self.generation:
+                    self._checked_at = now
+                self.revalidations += 1
+            return value
+
+        value = self._load()
+        with self._lock:
+            # Not stored if a writer cleared the snapshot while this one was loading
+            if generation == self.generation:
+                self._value, self._version, self._checked_at = value, version, now
+            self.misses += 1
+        return value
+
+    def clear(self):
+        """Drop the snapshot; the next read reloads it."""
+        with self._lock:
+            self._value = None
+            self._version = None
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                'entries': 0 if self._value is None else 1,
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,45 @@
+"""
+Flask CLI Commands
+
+Maintenance commands run with `flask <group> <command>`.
+"""
+import click
+from flask.cli import AppGroup
+
+
+balances_cli = AppGroup('balances', help='Materialized balance maintenance.')
+rollups_cli = AppGroup('rollups', help='Daily activity rollup maintenance.')
+
+
+@balances_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help='Report drift without rebuilding balances.')
+def reconcile_balances_command(dry_run):
+    """Rebuild account_balances from the ledger and report drift."""
+    from api.services.balances import reconcile_balances
+
+    result = reconcile_balances(repair=not dry_run)
+
+    for row in result['drift']:
+        click.echo(
+            f"  user {row['userId']}: ledger={row['ledgerBalance']} "
+            f"stored={row['storedBalance']}"
+        )
+    click.echo(
+        f"[Balances] Checked {result['usersChecked']} users, "
+        f"{len(result['drift'])} drifted, repaired={result['repaired']}"
+    )
+
+
+@rollups_cli.command('rebuild')
+def rebuild_rollups_command():
+    """Rebuild daily_activity_rollups from the ledger."""
+    from api.services.rollups import rebuild_rollups
+
+    rows = rebuild_rollups()
+    click.echo(f"[Rollups] Rebuilt {rows} daily rollup rows")
+
+
+def register_commands(app):
+    """Register all CLI command groups."""
+    app.cli.add_command(balances_cli)
+    app.cli.add_command(rollups_cli)
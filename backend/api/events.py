@@ -0,0 +1,217 @@
+"""
+Live Event Hub
+
+In-process pub/sub feeding the /api/events server-sent-event stream. Each
+open stream holds a bounded queue and filters events for its caller.
+
+Events come from the database, not from this process's writes: while any
+stream is open, one background thread per process (LedgerTail) reads new
+transactions by id and the roster version, so every worker sees commits
+made by any other. Commits in this process (see api.signals) wake the tail
+at once; others are picked up within SSE_POLL_SECONDS.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import func
+
+from api import db
+from api.models import ResourceVersion, Transaction
+from api.signals import ledger_committed, roster_committed
+
+
+class Subscription:
+    """One open stream's queue. `overflowed` is set when events had to be dropped."""
+
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+
+class EventHub:
+    """Fan-out of event dicts ({'event': name, 'data': {...}}) to every subscription."""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, max_queue=256):
+        subscription = Subscription(max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+    def publish(self, event):
+        """Queue `event` for every subscription without blocking; slow readers lose events."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self.published += 1
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+                with self._lock:
+                    self.dropped += 1
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                'subscribers': len(self._subscriptions),
+                'published': self.published,
+                'dropped': self.dropped
+            }
+
+
+hub = EventHub()
+
+
+def ledger_event(row):
+    """Event for one committed ledger row (a Transaction or a row with its columns)."""
+    created_at = row.created_at
+    return {
+        'event': row.type.value,
+        'data': {
+            'id': row.id,
+            'userId': row.user_id,
+            'amount': row.amount,
+            'type': row.type.value,
+            'categoryId': row.category_id,
+            'createdAt': created_at.isoformat() if created_at else None
+        }
+    }
+
+
+class LedgerTail:
+    """
+    Publishes ledger rows and roster changes committed by any process.
+
+    `poll()` reads the roster's ResourceVersion and transactions above a
+    settled id (a primary key range). Ids are not committed in order on
+    PostgreSQL (a transaction holding id N can commit after N+1), so the
+    settled id trails the highest id seen by LOOKBACK_SECONDS: rows in that
+    window are re-read and those already published are skipped. When the
+    first stream opens the current position is recorded, so nothing older is
+    replayed.
+    """
+
+    # Ledger rows read per query
+    BATCH_SIZE = 500
+
+    # How long a ledger write may stay uncommitted and still be published
+    LOOKBACK_SECONDS = 30
+
+    def __init__(self, hub):
+        self.hub = hub
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self._settled_id = None  # Every id at or below this has been published or skipped
+        self._sent = set()  # Published ids above _settled_id
+        self._marks = deque()  # (monotonic time, highest id seen) per poll
+        self._roster_version = None
+        self.polls = 0
+
+    def subscribe(self, app, max_queue=256):
+        """
+        Open a hub subscription and make sure `app`'s polling thread is running.
+        The first stream to open records the current position. Needs an app context.
+        """
+        with self._lock:
+            if not self.hub.subscriber_count():
+                self._settled_id = None
+                self._poll()
+            subscription = self.hub.subscribe(max_queue)
+            self._app = app
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='ledger-tail', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def wake(self):
+        """Poll now instead of at the next interval."""
+        self._wake.set()
+
+    def poll(self):
+        """Publish everything committed since the last poll. Needs an app context."""
+        with self._lock:
+            self._poll()
+
+    def _poll(self):
+        self.polls += 1
+        now = time.monotonic()
+        roster_version = db.session.query(ResourceVersion.version).filter(
+            ResourceVersion.name == 'roster'
+        ).scalar()
+        if self._settled_id is None:
+            top = db.session.query(func.max(Transaction.id)).scalar() or 0
+            self._settled_id = top
+            self._sent.clear()
+            self._marks = deque([(now, top)])
+            self._roster_version = roster_version
+            return
+
+        if roster_version != self._roster_version:
+            self._roster_version = roster_version
+            self.hub.publish({'event': 'roster', 'data': {}})
+
+        after = self._settled_id
+        while True:
+            rows = db.session.query(
+                Transaction.id, Transaction.user_id, Transaction.amount, Transaction.type,
+                Transaction.category_id, Transaction.created_at
+            ).filter(
+                Transaction.id > after
+            ).order_by(Transaction.id).limit(self.BATCH_SIZE).all()
+            for row in rows:
+                if row.id not in self._sent:
+                    self._sent.add(row.id)
+                    self.hub.publish(ledger_event(row))
+            if rows:
+                after = rows[-1].id
+            if len(rows) < self.BATCH_SIZE:
+                break
+
+        # Settle up to the highest id already seen LOOKBACK_SECONDS ago
+        self._marks.append((now, max(after, self._marks[-1][1])))
+        while len(self._marks) > 1 and self._marks[1][0] <= now - self.LOOKBACK_SECONDS:
+            self._marks.popleft()
+        if self._marks[0][0] <= now - self.LOOKBACK_SECONDS:
+            self._settled_id = self._marks[0][1]
+            self._sent = {sent for sent in self._sent if sent > self._settled_id}
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._app.config['SSE_POLL_SECONDS'])
+            self._wake.clear()
+            app = self._app
+            if not self.hub.subscriber_count():
+                continue
+            try:
+                with app.app_context():
+                    self.poll()
+            except Exception as e:
+                app.logger.warning('Event stream poll failed: %s', e)
+
+
+tail = LedgerTail(hub)
+
+
+@ledger_committed.connect
+@roster_committed.connect
+def _wake_tail(sender, **kwargs):
+    tail.wake()
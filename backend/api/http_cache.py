@@ -0,0 +1,114 @@
+"""
+HTTP Conditional GET
+
+ETag / Last-Modified validation for read-heavy endpoints that dashboards poll.
+Each endpoint declares the resources its response depends on; the ETag is
+derived from their version counters (resource_versions, plus the "ledger"
+counter and the current hour where the response depends on transactions),
+so a matching If-None-Match is answered with 304 before the endpoint's own queries or
+serialization run.
+
+Responses carry `Cache-Control: private, no-cache`: browsers keep them but
+revalidate on every use, and shared caches such as nginx never store them.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api import db
+from api.models import (
+    ResourceVersion, FocusBehavior, User, SystemConfig, RaffleDraw, Transaction,
+)
+
+
+# ORM models whose writes bump each resource's version
+RESOURCE_MODELS = {
+    'behaviors': (FocusBehavior,),
+    'roster': (User,),
+    'config': (SystemConfig,),
+    'raffle': (RaffleDraw,),
+    'ledger': (Transaction,),  # Core inserts bump it in api.services.ledger
+}
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_resource_versions(session, flush_context):
+    changed = set()
+    for obj in (*session.new, *session.deleted, *(o for o in session.dirty if session.is_modified(o))):
+        for name, models in RESOURCE_MODELS.items():
+            if isinstance(obj, models):
+                changed.add(name)
+    if changed:
+        ResourceVersion.bump(session.connection(), changed)
+
+
+def _validators(resources, ledger):
+    """Return (etag, last_modified) for the current versions of `resources`."""
+    if ledger:
+        resources = (*resources, 'ledger')
+    rows = db.session.query(
+        ResourceVersion.name, ResourceVersion.version, ResourceVersion.updated_at
+    ).filter(ResourceVersion.name.in_(resources)).all()
+    versions = {name: version for name, version, _ in rows}
+    stamps = [updated_at for _, _, updated_at in rows if updated_at]
+
+    parts = [request.full_path] + [f"{name}:{versions.get(name, 0)}" for name in resources]
+    if ledger:
+        # Ledger-backed responses also move with their time windows ("this week")
+        parts.append(datetime.utcnow().strftime('%Y-%m-%dT%H'))
+
+    etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+    return etag, max(stamps) if stamps else None
+
+
+def _http_last_modified(last_modified):
+    """
+    Last-Modified header value (whole seconds) for a stamp with microseconds.
+
+    Rounded up once that second is over, so an unchanged resource can still
+    get a 304; while it is current, rounded down, so If-Modified-Since never
+    matches and a change later in the same second cannot be missed.
+    """
+    whole = last_modified.replace(microsecond=0)
+    if whole == last_modified:
+        return whole
+    rounded_up = whole + timedelta(seconds=1)
+    return rounded_up if rounded_up <= datetime.utcnow() else whole
+
+
+def conditional_get(*resources, ledger=False):
+    """
+    Decorator: answer 304 when the client's ETag (or Last-Modified) is current.
+    Apply below the auth decorator so unauthenticated requests never see a 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag, last_modified = _validators(resources, ledger)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                # Compared at full precision: a change later in the header's second is never a 304
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since.replace(tzinfo=None))
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = _http_last_modified(last_modified)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return decorated_function
+    return decorator
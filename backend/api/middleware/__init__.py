@@ -1,4 +1,4 @@
 """
 API Middleware Package
 """
-from api.middleware.auth import login_required, teacher_required, admin_required, get_current_user
+from api.middleware.auth import login_required, teacher_required, admin_required, get_current_user, current_identity
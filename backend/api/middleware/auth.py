@@ -4,24 +4,50 @@ Authorization Middleware
 Decorators for protecting routes based on user role.
 """
 from functools import wraps
-from flask import session, jsonify
+from flask import session, jsonify, current_app
+from api import db
 from api.models import User, UserRole
+from api.sessions import issue_session, session_claims
 
 
 def get_current_user():
-    """Get the currently authenticated user from session."""
+    """
+    Get the currently authenticated user from session.
+
+    Loaded through the session's identity map, so repeated calls within a
+    request share one lookup.
+    """
     user_id = session.get('user_id')
     if not user_id:
         return None
-    return User.query.get(user_id)
+    return db.session.get(User, user_id)
+
+
+def current_identity():
+    """
+    Return (user_id, UserRole) for the request, or None if not authenticated.
+
+    Fresh signed claims are trusted as-is; stale or revoked ones are checked
+    against the user row and re-issued, or the session is cleared.
+    """
+    claims = session_claims(current_app.config['AUTH_REVALIDATE_SECONDS'])
+    if claims is None:
+        if not session.get('user_id'):
+            return None
+        user = get_current_user()
+        if not user or not user.is_active or user.session_version != session.get('session_version'):
+            session.clear()
+            return None
+        issue_session(user)
+        claims = (user.id, user.role.value)
+    return claims[0], UserRole(claims[1])
 
 
 def login_required(f):
     """Decorator: Require any authenticated user."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user or not user.is_active:
+        if not current_identity():
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
         return f(*args, **kwargs)
     return decorated_function
@@ -31,10 +57,10 @@ def teacher_required(f):
     """Decorator: Require teacher or admin role."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user or not user.is_active:
+        identity = current_identity()
+        if not identity:
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
-        if user.role not in [UserRole.TEACHER, UserRole.ADMIN]:
+        if identity[1] not in [UserRole.TEACHER, UserRole.ADMIN]:
             return jsonify({'success': False, 'error': 'Teacher access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -44,10 +70,10 @@ def admin_required(f):
     """Decorator: Require admin role."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user or not user.is_active:
+        identity = current_identity()
+        if not identity:
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
-        if user.role != UserRole.ADMIN:
+        if identity[1] != UserRole.ADMIN:
             return jsonify({'success': False, 'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
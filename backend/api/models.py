@@ -5,9 +5,14 @@ Core entities for the school reward banking system.
 """
 from datetime import datetime, date
 from enum import Enum as PyEnum
+from functools import lru_cache
+from flask import current_app, has_app_context
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from api import db
+from api.cache import VersionedSnapshot
+from api.sql import upsert_insert
 
 
 class UserRole(PyEnum):
@@ -26,6 +31,27 @@ class TransactionType(PyEnum):
     RAFFLE = "raffle"        # Raffle prize winnings
 
 
+class InterestRunStatus(PyEnum):
+    """Interest run lifecycle states."""
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+def pin_hash_method(role):
+    """Configured Werkzeug hash method for a role, or None for Werkzeug's default."""
+    if not has_app_context():
+        return None
+    return current_app.config.get('PASSWORD_HASH_METHODS', {}).get(role.value)
+
+
+@lru_cache(maxsize=None)
+def _hash_prefix(method):
+    """The "method:params" prefix Werkzeug writes for `method` (defaults filled in)."""
+    args = (method,) if method else ()
+    return generate_password_hash('', *args).split('$', 1)[0]
+
+
 class User(db.Model):
     """
     User model for students, teachers, and admins.
@@ -39,9 +65,12 @@ class User(db.Model):
     role = db.Column(db.Enum(UserRole), nullable=False, default=UserRole.STUDENT)
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
-    class_name = db.Column(db.String(50), nullable=True)  # e.g., "5A", "3B"
+    # e.g., "5A", "3B". Old value kept on change so rollups can move with the student
+    class_name = db.column_property(db.Column(db.String(50), nullable=True), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped to revoke every signed session issued for this user
+    session_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
     transactions = db.relationship('Transaction', backref='user', lazy='dynamic',
@@ -49,14 +78,35 @@ class User(db.Model):
     daily_snapshots = db.relationship('DailySnapshot', backref='user', lazy='dynamic')
     focus_behaviors = db.relationship('TeacherFocusBehavior', backref='teacher', lazy='dynamic')
     
+    __table_args__ = (
+        # Roster filters: active students, optionally by class
+        db.Index('ix_users_role_active_class', 'role', 'is_active', 'class_name'),
+    )
+    
+    def hash_pin(self, pin: str) -> str:
+        """Hash a PIN/password with the method configured for this user's role."""
+        method = pin_hash_method(self.role or UserRole.STUDENT)
+        if method:
+            return generate_password_hash(pin, method)
+        return generate_password_hash(pin)
+    
     def set_pin(self, pin: str):
         """Hash and store the PIN/password."""
-        self.pin_hash = generate_password_hash(pin)
+        self.pin_hash = self.hash_pin(pin)
     
     def check_pin(self, pin: str) -> bool:
         """Verify PIN/password against stored hash."""
         return check_password_hash(self.pin_hash, pin)
     
+    def needs_rehash(self) -> bool:
+        """True if the stored hash was made with other parameters than the role's current ones."""
+        method = pin_hash_method(self.role or UserRole.STUDENT)
+        return self.pin_hash.split('$', 1)[0] != _hash_prefix(method)
+    
+    def revoke_sessions(self):
+        """Invalidate all signed sessions issued so far (takes effect on commit)."""
+        self.session_version = (self.session_version or 1) + 1
+    
     @property
     def full_name(self) -> str:
         """Return full name."""
@@ -64,15 +114,17 @@ class User(db.Model):
     
     @property
     def balance(self) -> int:
-        """Calculate current balance from transaction ledger."""
-        from sqlalchemy import func
-        result = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == self.id
+        """Current balance, read from the materialized account_balances row."""
+        result = db.session.query(AccountBalance.balance).filter(
+            AccountBalance.user_id == self.id
         ).scalar()
         return result or 0
     
-    def to_dict(self, include_balance=False):
-        """Serialize user to dictionary."""
+    def to_dict(self, include_balance=False, balance=None):
+        """
+        Serialize user to dictionary.
+        Pass `balance` when it was already fetched in bulk to skip the per-user lookup.
+        """
         data = {
             'id': self.id,
             'username': self.username,
@@ -84,7 +136,9 @@ class User(db.Model):
             'isActive': self.is_active,
             'createdAt': self.created_at.isoformat() if self.created_at else None
         }
-        if include_balance:
+        if balance is not None:
+            data['balance'] = balance
+        elif include_balance:
             data['balance'] = self.balance
         return data
 
@@ -92,12 +146,12 @@ class User(db.Model):
 class Transaction(db.Model):
     """
     Immutable ledger of all DB$ movements.
-    Balance is calculated by summing all transactions for a user.
+    Balance is the sum of all transactions for a user, materialized in AccountBalance.
     """
     __tablename__ = 'transactions'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Led by the composites below
     amount = db.Column(db.Integer, nullable=False)  # Positive for credit, negative for debit
     type = db.Column(db.Enum(TransactionType), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('focus_behaviors.id'), nullable=True)
@@ -109,6 +163,16 @@ class Transaction(db.Model):
     category = db.relationship('FocusBehavior', backref='transactions')
     created_by = db.relationship('User', foreign_keys=[created_by_id])
     
+    __table_args__ = (
+        # Keyset pagination of history, per user and per type
+        db.Index('ix_transactions_user_created_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_transactions_type_created_id', 'type', 'created_at', 'id'),
+        # Covers per-user totals by type (interest earned) without touching the table
+        db.Index('ix_transactions_user_type_amount', 'user_id', 'type', 'amount'),
+        # Behavior breakdown over a date window
+        db.Index('ix_transactions_category_created', 'category_id', 'created_at'),
+    )
+    
     def to_dict(self):
         """Serialize transaction to dictionary."""
         return {
@@ -124,6 +188,180 @@ class Transaction(db.Model):
         }
 
 
+class AccountBalance(db.Model):
+    """
+    Materialized running balance per user.
+    Maintained in the same DB transaction as every ledger insert, so reads are
+    a primary-key lookup instead of a SUM over the user's whole history.
+    Rebuild from the ledger with `flask balances reconcile`.
+    """
+    __tablename__ = 'account_balances'
+    
+    # Rows per multi-row upsert statement (keeps bound parameters well under SQLite's limit)
+    UPSERT_CHUNK_SIZE = 500
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    balance = db.Column(db.Integer, nullable=False, default=0, index=True)  # Supports rank counts
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def apply_deltas(cls, connection, deltas: dict):
+        """
+        Add {user_id: amount} deltas to the stored balances, creating rows as needed.
+        Runs on the caller's connection so it commits or rolls back with the ledger rows.
+        """
+        if not deltas:
+            return
+        table = cls.__table__
+        now = datetime.utcnow()
+        rows = [
+            {'user_id': user_id, 'balance': amount, 'updated_at': now}
+            for user_id, amount in deltas.items()
+        ]
+        for start in range(0, len(rows), cls.UPSERT_CHUNK_SIZE):
+            stmt = upsert_insert(connection, table).values(rows[start:start + cls.UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={
+                    'balance': table.c.balance + stmt.excluded.balance,
+                    'updated_at': stmt.excluded.updated_at,
+                }
+            )
+            connection.execute(stmt)
+
+
+class DailyActivityRollup(db.Model):
+    """
+    Ledger activity per day, class, transaction type and behavior.
+    Maintained in the same DB transaction as every ledger insert, so analytics
+    read a few rows per day instead of scanning transactions.
+    Rows are attributed to the student's current class: when a student changes
+    class their history moves with them (see `reattribute`), so the table always
+    equals a rebuild from the ledger and today's roster (`flask rollups rebuild`).
+    """
+    __tablename__ = 'daily_activity_rollups'
+    
+    # Key sentinels: class_name and category_id are part of the primary key, so never NULL
+    NO_CLASS = ''
+    NO_CATEGORY = 0
+    
+    date = db.Column(db.Date, primary_key=True)
+    class_name = db.Column(db.String(50), primary_key=True, default=NO_CLASS)
+    type = db.Column(db.Enum(TransactionType), primary_key=True)
+    category_id = db.Column(db.Integer, primary_key=True, default=NO_CATEGORY)
+    tx_count = db.Column(db.Integer, nullable=False, default=0)
+    amount_total = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def apply(cls, connection, rows):
+        """
+        Add ledger rows (dicts with user_id, amount, type, category_id, created_at)
+        to the rollups, creating rows as needed. The student's class is read in
+        the same statement. Runs on the caller's connection, like apply_deltas.
+        """
+        totals = {}
+        for row in rows:
+            key = (row['created_at'].date(), row['user_id'], row['type'], row.get('category_id') or cls.NO_CATEGORY)
+            count, amount = totals.get(key, (0, 0))
+            totals[key] = (count + 1, amount + row['amount'])
+        if not totals:
+            return
+        
+        table = cls.__table__
+        users = User.__table__
+        stmt = upsert_insert(connection, table).from_select(
+            ['date', 'class_name', 'type', 'category_id', 'tx_count', 'amount_total'],
+            db.select(
+                db.bindparam('date', type_=table.c.date.type),
+                db.func.coalesce(users.c.class_name, cls.NO_CLASS),
+                db.bindparam('type', type_=table.c.type.type),
+                db.bindparam('category_id', type_=db.Integer),
+                db.bindparam('tx_count', type_=db.Integer),
+                db.bindparam('amount_total', type_=db.Integer)
+            ).where(users.c.id == db.bindparam('user_id'))
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.date, table.c.class_name, table.c.type, table.c.category_id],
+            set_={
+                'tx_count': table.c.tx_count + stmt.excluded.tx_count,
+                'amount_total': table.c.amount_total + stmt.excluded.amount_total,
+            }
+        )
+        connection.execute(stmt, [
+            {'date': day, 'user_id': user_id, 'type': tx_type, 'category_id': category_id,
+             'tx_count': count, 'amount_total': amount}
+            for (day, user_id, tx_type, category_id), (count, amount) in totals.items()
+        ])
+
+
+    @classmethod
+    def reattribute(cls, connection, user_id, old_class, new_class):
+        """
+        Move a student's ledger history from `old_class`'s rollups to `new_class`'s.
+        One grouped read of the student's transactions (by the user_id index) per side.
+        """
+        table = cls.__table__
+        ledger = Transaction.__table__
+        day = db.func.date(ledger.c.created_at)
+        category_id = db.func.coalesce(ledger.c.category_id, cls.NO_CATEGORY)
+        old_class = old_class or cls.NO_CLASS
+        new_class = new_class or cls.NO_CLASS
+        for class_name, sign in ((old_class, -1), (new_class, 1)):
+            stmt = upsert_insert(connection, table).from_select(
+                ['date', 'class_name', 'type', 'category_id', 'tx_count', 'amount_total'],
+                db.select(
+                    day, db.literal(class_name), ledger.c.type, category_id,
+                    sign * db.func.count(ledger.c.id), sign * db.func.sum(ledger.c.amount)
+                ).where(ledger.c.user_id == user_id).group_by(day, ledger.c.type, category_id)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.date, table.c.class_name, table.c.type, table.c.category_id],
+                set_={
+                    'tx_count': table.c.tx_count + stmt.excluded.tx_count,
+                    'amount_total': table.c.amount_total + stmt.excluded.amount_total,
+                }
+            )
+            connection.execute(stmt)
+        connection.execute(table.delete().where(table.c.class_name == old_class, table.c.tx_count == 0))
+
+
+@event.listens_for(Transaction, 'after_insert')
+def _apply_transaction_to_aggregates(mapper, connection, target):
+    """Keep account_balances and daily_activity_rollups in step with ORM-inserted ledger rows."""
+    AccountBalance.apply_deltas(connection, {target.user_id: target.amount})
+    DailyActivityRollup.apply(connection, [{
+        'user_id': target.user_id,
+        'amount': target.amount,
+        'type': target.type,
+        'category_id': target.category_id,
+        'created_at': target.created_at
+    }])
+
+
+@event.listens_for(User.pin_hash, 'set')
+@event.listens_for(User.role, 'set')
+def _revoke_on_credential_change(target, value, oldvalue, initiator):
+    """A new PIN or role invalidates sessions signed with the old one."""
+    if target.id is not None:
+        target.revoke_sessions()
+
+
+@event.listens_for(User, 'after_update')
+def _move_rollups_with_class(mapper, connection, target):
+    """Rollups follow the student's current class (see DailyActivityRollup)."""
+    history = db.inspect(target).attrs.class_name.history
+    if history.has_changes():
+        old_class = history.deleted[0] if history.deleted else None
+        DailyActivityRollup.reattribute(connection, target.id, old_class, target.class_name)
+
+
+@event.listens_for(User.is_active, 'set')
+def _revoke_on_deactivate(target, value, oldvalue, initiator):
+    """Deactivated users are logged out everywhere."""
+    if target.id is not None and not value:
+        target.revoke_sessions()
+
+
 class DailySnapshot(db.Model):
     """
     Daily balance snapshot for interest calculation.
@@ -138,6 +376,8 @@ class DailySnapshot(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'date', name='unique_user_date_snapshot'),
+        # Covers the weekly MIN(balance) per student over a date range
+        db.Index('ix_daily_snapshots_date_user_balance', 'date', 'user_id', 'balance_at_snapshot'),
     )
     
     def to_dict(self):
@@ -150,6 +390,39 @@ class DailySnapshot(db.Model):
         }
 
 
+class InterestRun(db.Model):
+    """
+    One weekly interest payout, keyed by ISO week (e.g. "2026-W42").
+    Makes reruns a no-op and lets a crashed run resume where it left off.
+    """
+    __tablename__ = 'interest_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    week = db.Column(db.String(10), nullable=False, unique=True)
+    status = db.Column(db.Enum(InterestRunStatus), nullable=False, default=InterestRunStatus.RUNNING)
+    interest_rate = db.Column(db.Float, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+    total_paid = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    
+    def to_dict(self):
+        """Serialize interest run to dictionary."""
+        return {
+            'id': self.id,
+            'week': self.week,
+            'status': self.status.value,
+            'interestRate': self.interest_rate,
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+            'studentCount': self.student_count,
+            'totalPaid': self.total_paid,
+            'error': self.error
+        }
+
+
 class FocusBehavior(db.Model):
     """
     Behavioral categories for awarding DB$.
@@ -242,14 +515,24 @@ class SystemConfig(db.Model):
         'interest_rate': ('2.0', 'Weekly interest rate as percentage'),
         'raffle_prize_default': ('50', 'Default DB$ prize for raffle winner'),
         'interest_day': ('sunday', 'Day of week to calculate interest'),
+        'term_start_dates': ('', 'Comma-separated term start dates (YYYY-MM-DD) for term trends; quarters if empty'),
     }
     
+    @classmethod
+    def all_values(cls):
+        """
+        Every stored row as {key: (value, description)}, from the in-process snapshot.
+        Rechecked against the table's version stamp every CONFIG_CACHE_CHECK_SECONDS.
+        """
+        check_interval = current_app.config.get('CONFIG_CACHE_CHECK_SECONDS', 5) if has_app_context() else 0
+        return _config_snapshot.get(check_interval)
+    
     @classmethod
     def get(cls, key: str, default=None):
         """Get a config value by key."""
-        config = cls.query.get(key)
-        if config:
-            return config.value
+        stored = cls.all_values().get(key)
+        if stored:
+            return stored[0]
         # Return from defaults if not in database
         if key in cls.DEFAULTS:
             return cls.DEFAULTS[key][0]
@@ -258,14 +541,70 @@ class SystemConfig(db.Model):
     @classmethod
     def set(cls, key: str, value: str):
         """Set a config value."""
-        config = cls.query.get(key)
-        if config:
-            config.value = value
-        else:
-            description = cls.DEFAULTS.get(key, (None, None))[1]
-            config = cls(key=key, value=value, description=description)
-            db.session.add(config)
+        cls.set_many({key: value})
+    
+    @classmethod
+    def set_many(cls, values: dict):
+        """Set several config values in one transaction."""
+        existing = {c.key: c for c in cls.query.filter(cls.key.in_(list(values))).all()}
+        for key, value in values.items():
+            config = existing.get(key)
+            if config:
+                config.value = value
+            else:
+                description = cls.DEFAULTS.get(key, (None, None))[1]
+                db.session.add(cls(key=key, value=value, description=description))
         db.session.commit()
+        _config_snapshot.clear()
+
+
+def _load_config_snapshot():
+    return {
+        key: (value, description)
+        for key, value, description in db.session.query(
+            SystemConfig.key, SystemConfig.value, SystemConfig.description
+        )
+    }
+
+
+def _config_version_stamp():
+    """Changes whenever a config row is added, removed or updated."""
+    return tuple(db.session.query(db.func.count(SystemConfig.key), db.func.max(SystemConfig.updated_at)).one())
+
+
+_config_snapshot = VersionedSnapshot('system_config', _load_config_snapshot, _config_version_stamp)
+
+
+class ResourceVersion(db.Model):
+    """
+    Change counter per cacheable resource ("behaviors", "roster", "config", "raffle").
+    Bumped in the same DB transaction as any ORM write to the resource's models
+    (see api.http_cache), so a version read is enough to validate an ETag.
+    """
+    __tablename__ = 'resource_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    
+    @classmethod
+    def bump(cls, connection, names):
+        """Increment the given resources' versions, creating rows as needed."""
+        if not names:
+            return
+        table = cls.__table__
+        now = datetime.utcnow()
+        stmt = upsert_insert(connection, table).values([
+            {'name': name, 'version': 1, 'updated_at': now} for name in sorted(names)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={
+                'version': table.c.version + 1,
+                'updated_at': stmt.excluded.updated_at,
+            }
+        )
+        connection.execute(stmt)
 
 
 # =============================================================================
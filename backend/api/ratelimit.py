@@ -0,0 +1,84 @@
+"""
+Rate Limiting
+
+In-process sliding-window limiters. Each worker process counts attempts on
+its own, so with N workers a client can make up to N times the limit; that
+still bounds the work a runaway client or a brute-force script can cause.
+"""
+import threading
+import time
+from collections import deque
+
+
+# All limiters by name, for the admin metrics endpoint
+limiters = {}
+
+
+class SlidingWindowLimiter:
+    """
+    Allows at most `limit` attempts per key in any `window`-second span.
+
+    Attempts are kept as timestamps per key (a sliding log), so there is no
+    burst at fixed window boundaries. Rejected attempts are not recorded, so
+    a client that keeps retrying is let back in once its old attempts age out.
+    """
+
+    # Above this many keys, expired ones are swept on the next attempt
+    SWEEP_THRESHOLD = 10000
+
+    def __init__(self, name):
+        self.name = name
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        limiters[name] = self
+
+    def hit(self, key, limit, window):
+        """
+        Record an attempt for `key`.
+        Returns 0 if allowed, else the seconds until the next attempt would be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if len(self._attempts) > self.SWEEP_THRESHOLD:
+                self._sweep(now, window)
+            attempts = self._attempts.setdefault(key, deque())
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            if len(attempts) >= limit:
+                self.rejected += 1
+                return attempts[0] + window - now
+            attempts.append(now)
+            self.allowed += 1
+            return 0
+
+    def forgive(self, key):
+        """Drop the latest attempt for `key` (e.g. a shared IP's successful login)."""
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts:
+                attempts.pop()
+
+    def reset(self, key):
+        """Forget the attempts for `key` (e.g. after a successful login)."""
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def clear(self):
+        """Forget every key."""
+        with self._lock:
+            self._attempts.clear()
+
+    def _sweep(self, now, window):
+        for key in [k for k, attempts in self._attempts.items() if not attempts or attempts[-1] <= now - window]:
+            del self._attempts[key]
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                'trackedKeys': len(self._attempts),
+                'allowed': self.allowed,
+                'rejected': self.rejected
+            }
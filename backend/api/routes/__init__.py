@@ -14,6 +14,7 @@ def register_routes(app):
     from api.routes.raffle import raffle_bp
     from api.routes.analytics import analytics_bp
     from api.routes.admin import admin_bp
+    from api.routes.events import events_bp
     
     # Register blueprints with /api prefix
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -24,6 +25,7 @@ def register_routes(app):
     app.register_blueprint(raffle_bp, url_prefix='/api/raffle')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
     
     # Health check endpoint
     @app.route('/api/health')
@@ -3,19 +3,23 @@ Admin Routes
 
 System configuration and admin-only management.
 """
+from datetime import date
+
 from flask import Blueprint, request, jsonify
 from api import db
-from api.models import User, UserRole, SystemConfig
+from api.models import User, UserRole, SystemConfig, InterestRun
 from api.middleware import admin_required, get_current_user
+from api.http_cache import conditional_get
 
 admin_bp = Blueprint('admin', __name__)
 
 
 @admin_bp.route('/config', methods=['GET'])
 @admin_required
+@conditional_get('config')
 def get_config():
     """Get all system configuration values."""
-    configs = SystemConfig.query.all()
+    configs = SystemConfig.all_values()
     
     # Build config dict including defaults
     config_dict = {}
@@ -26,10 +30,10 @@ def get_config():
         }
     
     # Override with actual values
-    for config in configs:
-        config_dict[config.key] = {
-            'value': config.value,
-            'description': config.description
+    for key, (value, description) in configs.items():
+        config_dict[key] = {
+            'value': value,
+            'description': description
         }
     
     return jsonify({
@@ -47,9 +51,12 @@ def update_config():
     Request body:
     {
         "interestRate": "2.5",
-        "rafflePrizeDefault": "75"
+        "rafflePrizeDefault": "75",
+        "termStartDates": "2026-09-01,2027-01-06,2027-04-20"
     }
     """
+    from api.services.trends import parse_term_start_dates
+    
     data = request.get_json()
     
     if not data:
@@ -59,10 +66,12 @@ def update_config():
     key_map = {
         'interestRate': 'interest_rate',
         'rafflePrizeDefault': 'raffle_prize_default',
-        'interestDay': 'interest_day'
+        'interestDay': 'interest_day',
+        'termStartDates': 'term_start_dates'
     }
     
-    updated = []
+    # Validate everything first, then write all keys in one transaction
+    updates = {}
     for camel_key, value in data.items():
         snake_key = key_map.get(camel_key, camel_key)
         
@@ -83,12 +92,19 @@ def update_config():
             except ValueError:
                 return jsonify({'success': False, 'error': 'Invalid prize amount'}), 400
         
-        SystemConfig.set(snake_key, str(value))
-        updated.append(snake_key)
+        if snake_key == 'term_start_dates':
+            try:
+                parse_term_start_dates(str(value))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Term start dates must be YYYY-MM-DD, comma-separated'}), 400
+        
+        updates[snake_key] = str(value)
+    
+    SystemConfig.set_many(updates)
     
     return jsonify({
         'success': True,
-        'updated': updated
+        'updated': list(updates)
     })
 
 
@@ -164,13 +180,68 @@ def create_user():
 @admin_bp.route('/trigger-interest', methods=['POST'])
 @admin_required
 def trigger_interest_calculation():
-    """Manually trigger interest calculation (for testing)."""
-    from api.services.interest import calculate_weekly_interest
+    """
+    Manually trigger interest calculation.
     
-    result = calculate_weekly_interest()
+    Request body (optional):
+    {
+        "dryRun": true  // preview the per-student plan without paying
+    }
+    
+    A real run pays the current week, so outside the interest day it is only
+    allowed to resume a failed or stalled run; otherwise it would use up the
+    week and the scheduled run would be skipped.
+    """
+    from api.services.interest import calculate_weekly_interest, is_interest_day, unfinished_run
+    
+    data = request.get_json(silent=True) or {}
+    dry_run = bool(data.get('dryRun', False))
+    
+    if not dry_run and not is_interest_day(date.today()) and unfinished_run() is None:
+        return jsonify({
+            'success': False,
+            'error': 'Interest can only be paid on the interest day; use dryRun to preview'
+        }), 409
+    
+    result = calculate_weekly_interest(dry_run=dry_run)
     
     return jsonify({
         'success': True,
-        'message': 'Interest calculation triggered',
+        'message': 'Interest preview generated' if dry_run else 'Interest calculation triggered',
         'result': result
     })
+
+
+@admin_bp.route('/interest-runs', methods=['GET'])
+@admin_required
+def list_interest_runs():
+    """
+    Get weekly interest run history, newest first.
+    
+    Query params:
+    - limit: Number of records (default 20)
+    """
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    runs = InterestRun.query.order_by(InterestRun.week.desc()).limit(limit).all()
+    
+    return jsonify({
+        'success': True,
+        'runs': [r.to_dict() for r in runs]
+    })
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Get in-process cache, rate-limit and live-event counters for this worker."""
+    from api.cache import caches
+    from api.events import hub
+    from api.ratelimit import limiters
+    
+    return jsonify({
+        'success': True,
+        'caches': {name: cache.stats() for name, cache in caches.items()},
+        'rateLimits': {name: limiter.stats() for name, limiter in limiters.items()},
+        'events': hub.stats()
+    })
@@ -4,19 +4,34 @@ Analytics Routes
 Leaderboards, trends, and usage statistics.
 Teacher-only access.
 """
-from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from datetime import date, datetime, timedelta
 from sqlalchemy import func, text
 
 from api import db
-from api.models import User, Transaction, TransactionType, UserRole, FocusBehavior
+from api.cache import TTLCache
+from api.models import (
+    User, Transaction, TransactionType, UserRole, FocusBehavior, AccountBalance, DailyActivityRollup
+)
 from api.middleware import teacher_required
+from api.http_cache import conditional_get
+from api.signals import ledger_committed, roster_committed
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# Leaderboards keyed by (type, class_name, limit); dropped on every ledger or roster commit
+leaderboard_cache = TTLCache('leaderboard')
+
+
+@ledger_committed.connect
+@roster_committed.connect
+def _invalidate_leaderboards(sender, **kwargs):
+    leaderboard_cache.clear()
+
 
 @analytics_bp.route('/leaderboard', methods=['GET'])
 @teacher_required
+@conditional_get('roster', ledger=True)
 def get_leaderboard():
     """
     Get top savers and top earners leaderboards.
@@ -30,67 +45,68 @@ def get_leaderboard():
     limit = min(request.args.get('limit', 10, type=int), 50)
     class_name = request.args.get('class_name')
     
-    # Base query for active students
-    student_ids_query = db.session.query(User.id).filter(
-        User.role == UserRole.STUDENT,
-        User.is_active == True
-    )
-    
-    if class_name:
-        student_ids_query = student_ids_query.filter(User.class_name == class_name)
-    
-    student_ids = [r[0] for r in student_ids_query.all()]
-    
-    if not student_ids:
-        return jsonify({
-            'success': True,
-            'leaderboard': [],
-            'type': leaderboard_type
-        })
+    cache_key = (leaderboard_type, class_name, limit)
+    leaderboard = leaderboard_cache.get(cache_key)
+    if leaderboard is None:
+        generation = leaderboard_cache.generation
+        leaderboard = _build_leaderboard(leaderboard_type, class_name, limit)
+        leaderboard_cache.set(
+            cache_key, leaderboard,
+            ttl=current_app.config['LEADERBOARD_CACHE_TTL'],
+            generation=generation
+        )
     
+    return jsonify({
+        'success': True,
+        'leaderboard': leaderboard,
+        'type': leaderboard_type
+    })
+
+
+def _build_leaderboard(leaderboard_type, class_name, limit):
+    """Rank active students by balance ("savers") or this week's earnings ("earners")."""
     if leaderboard_type == 'earners':
         # Top earners: sum of positive transactions this week
         week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        results = db.session.query(
-            Transaction.user_id,
-            func.sum(Transaction.amount).label('total')
+        total = func.sum(Transaction.amount)
+        query = db.session.query(
+            User.id, User.first_name, User.last_name, User.class_name, total
+        ).join(
+            Transaction, Transaction.user_id == User.id
         ).filter(
-            Transaction.user_id.in_(student_ids),
             Transaction.amount > 0,
             Transaction.created_at >= week_ago
-        ).group_by(Transaction.user_id).order_by(
-            func.sum(Transaction.amount).desc()
-        ).limit(limit).all()
+        ).group_by(User.id, User.first_name, User.last_name, User.class_name)
     else:
         # Top savers: current balance
-        results = db.session.query(
-            Transaction.user_id,
-            func.sum(Transaction.amount).label('total')
-        ).filter(
-            Transaction.user_id.in_(student_ids)
-        ).group_by(Transaction.user_id).order_by(
-            func.sum(Transaction.amount).desc()
-        ).limit(limit).all()
-    
-    # Build leaderboard with user details
-    leaderboard = []
-    for rank, (user_id, total) in enumerate(results, 1):
-        user = User.query.get(user_id)
-        if user:
-            leaderboard.append({
-                'rank': rank,
-                'userId': user_id,
-                'name': user.full_name,
-                'className': user.class_name,
-                'value': total or 0
-            })
+        total = AccountBalance.balance
+        query = db.session.query(
+            User.id, User.first_name, User.last_name, User.class_name, total
+        ).join(
+            AccountBalance, AccountBalance.user_id == User.id
+        )
+    
+    # Roster filter, aggregate and names in one statement
+    query = query.filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    )
     
-    return jsonify({
-        'success': True,
-        'leaderboard': leaderboard,
-        'type': leaderboard_type
-    })
+    if class_name:
+        query = query.filter(User.class_name == class_name)
+    
+    results = query.order_by(total.desc(), User.id).limit(limit).all()
+    
+    return [
+        {
+            'rank': rank,
+            'userId': user_id,
+            'name': f"{first_name} {last_name}",
+            'className': student_class,
+            'value': total or 0
+        }
+        for rank, (user_id, first_name, last_name, student_class, total) in enumerate(results, 1)
+    ]
 
 
 @analytics_bp.route('/behavior-breakdown', methods=['GET'])
@@ -101,25 +117,27 @@ def get_behavior_breakdown():
     Shows which behaviors are being rewarded most.
     """
     days = request.args.get('days', 30, type=int)
-    since = datetime.utcnow() - timedelta(days=days)
+    since = datetime.utcnow().date() - timedelta(days=days)
     
+    # Whole days from the rollups instead of scanning the ledger
+    award_count = func.sum(DailyActivityRollup.tx_count)
     results = db.session.query(
         FocusBehavior.name,
-        func.count(Transaction.id).label('count')
+        award_count.label('count')
     ).join(
-        Transaction, Transaction.category_id == FocusBehavior.id
+        DailyActivityRollup, DailyActivityRollup.category_id == FocusBehavior.id
     ).filter(
-        Transaction.type == TransactionType.AWARD,
-        Transaction.created_at >= since
+        DailyActivityRollup.type == TransactionType.AWARD,
+        DailyActivityRollup.date >= since
     ).group_by(FocusBehavior.name).order_by(
-        func.count(Transaction.id).desc()
+        award_count.desc()
     ).all()
     
     # Also count awards without category
-    uncategorized = db.session.query(func.count(Transaction.id)).filter(
-        Transaction.type == TransactionType.AWARD,
-        Transaction.category_id.is_(None),
-        Transaction.created_at >= since
+    uncategorized = db.session.query(award_count).filter(
+        DailyActivityRollup.type == TransactionType.AWARD,
+        DailyActivityRollup.category_id == DailyActivityRollup.NO_CATEGORY,
+        DailyActivityRollup.date >= since
     ).scalar() or 0
     
     breakdown = [{'behavior': name, 'count': count} for name, count in results]
@@ -133,6 +151,50 @@ def get_behavior_breakdown():
     })
 
 
+@analytics_bp.route('/trends', methods=['GET'])
+@teacher_required
+def get_trends():
+    """
+    Get awards, deposits, interest and circulation over time.
+    
+    Query params:
+    - period: "day", "week" (Monday start) or "term" (default "day")
+    - start / end: YYYY-MM-DD, inclusive (default: a period-dependent span ending today)
+    - class_name: Only this class
+    - behavior_id: Only awards for this behavior (other series are unaffected)
+    """
+    from api.services.trends import PERIODS, DEFAULT_SPAN_DAYS, MAX_RANGE_DAYS, build_trends
+    
+    period = request.args.get('period', 'day')
+    if period not in PERIODS:
+        return jsonify({'success': False, 'error': f"period must be one of {', '.join(PERIODS)}"}), 400
+    
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow().date()
+        start = (date.fromisoformat(request.args['start']) if request.args.get('start')
+                 else end - timedelta(days=DEFAULT_SPAN_DAYS[period]))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'start and end must be YYYY-MM-DD'}), 400
+    
+    if start > end:
+        return jsonify({'success': False, 'error': 'start must not be after end'}), 400
+    if (end - start).days >= MAX_RANGE_DAYS:
+        return jsonify({'success': False, 'error': f'Range is limited to {MAX_RANGE_DAYS} days'}), 400
+    
+    class_name = request.args.get('class_name')
+    behavior_id = request.args.get('behavior_id', type=int)
+    
+    return jsonify({
+        'success': True,
+        'period': period,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'className': class_name,
+        'behaviorId': behavior_id,
+        'series': build_trends(period, start, end, class_name, behavior_id)
+    })
+
+
 @analytics_bp.route('/system-stats', methods=['GET'])
 @teacher_required
 def get_system_stats():
@@ -140,19 +202,18 @@ def get_system_stats():
     # Total students
     total_students = User.query.filter_by(role=UserRole.STUDENT, is_active=True).count()
     
-    # Total DB$ in circulation
-    total_circulation = db.session.query(func.sum(Transaction.amount)).scalar() or 0
+    # Total DB$ in circulation (the ledger sum, kept materialized per account)
+    total_circulation = db.session.query(func.sum(AccountBalance.balance)).scalar() or 0
     
-    # Total transactions today
+    # Transaction counts and interest totals from the daily rollups
     today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    transactions_today = Transaction.query.filter(
-        Transaction.created_at >= today_start
-    ).count()
+    transactions_today = db.session.query(func.sum(DailyActivityRollup.tx_count)).filter(
+        DailyActivityRollup.date == today
+    ).scalar() or 0
     
     # Total interest distributed
-    total_interest = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.type == TransactionType.INTEREST
+    total_interest = db.session.query(func.sum(DailyActivityRollup.amount_total)).filter(
+        DailyActivityRollup.type == TransactionType.INTEREST
     ).scalar() or 0
     
     # Class breakdown
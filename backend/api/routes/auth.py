@@ -4,12 +4,35 @@ Authentication Routes
 Handles user login and session management.
 Simple PIN-based auth for students, password for teachers/admins.
 """
-from flask import Blueprint, request, jsonify, session
+import math
+
+from flask import Blueprint, request, jsonify, session, current_app
 from api import db
 from api.models import User, UserRole
+from api.ratelimit import SlidingWindowLimiter
+from api.sessions import issue_session
 
 auth_bp = Blueprint('auth', __name__)
 
+# Login attempts per username and per client IP (checked before any PIN hashing)
+login_user_limiter = SlidingWindowLimiter('login_username')
+login_ip_limiter = SlidingWindowLimiter('login_ip')
+
+
+def _throttle_login(username):
+    """Return a 429 response if this username or IP is over its attempt limit, else None."""
+    config = current_app.config
+    window = config['LOGIN_ATTEMPT_WINDOW_SECONDS']
+    retry_after = (
+        login_ip_limiter.hit(request.remote_addr, config['LOGIN_MAX_ATTEMPTS_PER_IP'], window)
+        or login_user_limiter.hit(username, config['LOGIN_MAX_ATTEMPTS_PER_USERNAME'], window)
+    )
+    if not retry_after:
+        return None
+    response = jsonify({'success': False, 'error': 'Too many login attempts. Try again shortly.'})
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response, 429
+
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -39,6 +62,10 @@ def login():
     if not username or not pin:
         return jsonify({'success': False, 'error': 'Username and PIN required'}), 400
     
+    throttled = _throttle_login(username)
+    if throttled:
+        return throttled
+    
     # Find user
     user = User.query.filter_by(username=username, is_active=True).first()
     
@@ -48,9 +75,19 @@ def login():
     if not user.check_pin(pin):
         return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
     
-    # Store user ID in session
-    session['user_id'] = user.id
-    session['user_role'] = user.role.value
+    # Upgrade hashes made with old parameters while the plain PIN is at hand.
+    # Conditional on the old hash so a concurrent PIN change wins; a Core
+    # update, since this is not a credential change and must not revoke sessions.
+    if user.needs_rehash():
+        User.query.filter_by(id=user.id, pin_hash=user.pin_hash).update(
+            {'pin_hash': user.hash_pin(pin)}, synchronize_session=False
+        )
+        db.session.commit()
+    
+    # Signed session claims let role checks skip the database
+    issue_session(user)
+    login_user_limiter.reset(username)
+    login_ip_limiter.forgive(request.remote_addr)
     
     return jsonify({
         'success': True,
@@ -75,7 +112,7 @@ def get_current_user():
     
     user = User.query.get(user_id)
     
-    if not user or not user.is_active:
+    if not user or not user.is_active or user.session_version != session.get('session_version'):
         session.clear()
         return jsonify({'success': False, 'error': 'User not found'}), 401
     
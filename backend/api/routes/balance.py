@@ -3,52 +3,85 @@ Balance Routes
 
 Get user balance and interest earned.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
 from api import db
-from api.models import User, Transaction, TransactionType, UserRole
-from api.middleware import login_required, teacher_required, get_current_user
+from api.cache import TTLCache
+from api.models import User, Transaction, TransactionType, UserRole, AccountBalance
+from api.middleware import login_required, teacher_required, current_identity
+from api.signals import ledger_committed, roster_committed
 
 balance_bp = Blueprint('balance', __name__)
 
+# Number of ranked students (active, with ledger history); dropped on every ledger or roster commit
+ranked_count_cache = TTLCache('ranked_students', max_entries=1)
+
+
+@ledger_committed.connect
+@roster_committed.connect
+def _invalidate_ranked_count(sender, **kwargs):
+    ranked_count_cache.clear()
+
+
+def _ranked_student_count():
+    """Active students with a balance row, cached for RANK_TOTAL_CACHE_TTL seconds."""
+    count = ranked_count_cache.get('students')
+    if count is None:
+        generation = ranked_count_cache.generation
+        count = db.session.query(func.count()).select_from(AccountBalance).join(
+            User, User.id == AccountBalance.user_id
+        ).filter(
+            User.role == UserRole.STUDENT,
+            User.is_active == True
+        ).scalar()
+        ranked_count_cache.set(
+            'students', count,
+            ttl=current_app.config['RANK_TOTAL_CACHE_TTL'],
+            generation=generation
+        )
+    return count
+
 
 @balance_bp.route('/me', methods=['GET'])
 @login_required
 def get_my_balance():
     """Get current user's balance and stats."""
-    current_user = get_current_user()
+    current_user_id, current_role = current_identity()
     
     # Calculate total interest earned
     interest_earned = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
+        Transaction.user_id == current_user_id,
         Transaction.type == TransactionType.INTEREST
     ).scalar() or 0
     
-    # Get savings rank (for students)
+    balance = db.session.query(AccountBalance.balance).filter(
+        AccountBalance.user_id == current_user_id
+    ).scalar()
+    
+    # Get savings rank (for students): 1 + number of active students with a higher balance.
+    # The count range-scans the balance index, so it reads only the students ahead.
     rank = None
     total_students = None
-    if current_user.role == UserRole.STUDENT:
-        # Get all student balances
-        from sqlalchemy import text
-        result = db.session.execute(text("""
-            SELECT user_id, SUM(amount) as balance
-            FROM transactions
-            WHERE user_id IN (SELECT id FROM users WHERE role = 'STUDENT' AND is_active = 1)
-            GROUP BY user_id
-            ORDER BY balance DESC
-        """)).fetchall()
-        
-        total_students = len(result)
-        for i, row in enumerate(result):
-            if row[0] == current_user.id:
-                rank = i + 1
-                break
+    if current_role == UserRole.STUDENT:
+        total_students = _ranked_student_count()
+        if balance is not None:
+            # EXISTS rather than a join, so the planner drives from the balance range
+            is_active_student = db.session.query(User.id).filter(
+                User.id == AccountBalance.user_id,
+                User.role == UserRole.STUDENT,
+                User.is_active == True
+            ).exists()
+            ahead = db.session.query(func.count()).select_from(AccountBalance).filter(
+                AccountBalance.balance > balance,
+                is_active_student
+            ).scalar()
+            rank = ahead + 1
     
     return jsonify({
         'success': True,
-        'balance': current_user.balance,
+        'balance': balance or 0,
         'interestEarned': interest_earned,
         'rank': rank,
         'totalStudents': total_students
@@ -6,13 +6,15 @@ Manage focus behaviors for quick-award buttons.
 from flask import Blueprint, request, jsonify
 from api import db
 from api.models import FocusBehavior, TeacherFocusBehavior, User, UserRole
-from api.middleware import teacher_required, get_current_user
+from api.middleware import teacher_required, current_identity
+from api.http_cache import conditional_get
 
 behaviors_bp = Blueprint('behaviors', __name__)
 
 
 @behaviors_bp.route('', methods=['GET'])
 @teacher_required
+@conditional_get('behaviors')
 def list_behaviors():
     """Get all available focus behaviors."""
     behaviors = FocusBehavior.query.filter_by(is_active=True).order_by(FocusBehavior.name).all()
@@ -66,10 +68,10 @@ def create_behavior():
 @teacher_required
 def get_my_focus_behaviors():
     """Get the current teacher's selected focus behaviors."""
-    current_user = get_current_user()
+    current_user_id = current_identity()[0]
     
     selections = TeacherFocusBehavior.query.filter_by(
-        teacher_id=current_user.id,
+        teacher_id=current_user_id,
         is_active=True
     ).order_by(TeacherFocusBehavior.display_order).all()
     
@@ -93,7 +95,7 @@ def set_my_focus_behaviors():
     }
     """
     data = request.get_json()
-    current_user = get_current_user()
+    current_user_id = current_identity()[0]
     
     if not data or 'behaviorIds' not in data:
         return jsonify({'success': False, 'error': 'behaviorIds required'}), 400
@@ -115,12 +117,12 @@ def set_my_focus_behaviors():
             return jsonify({'success': False, 'error': f'Behavior {bid} not found'}), 404
     
     # Clear existing selections
-    TeacherFocusBehavior.query.filter_by(teacher_id=current_user.id).delete()
+    TeacherFocusBehavior.query.filter_by(teacher_id=current_user_id).delete()
     
     # Add new selections
     for order, bid in enumerate(behavior_ids):
         selection = TeacherFocusBehavior(
-            teacher_id=current_user.id,
+            teacher_id=current_user_id,
             behavior_id=bid,
             is_active=True,
             display_order=order
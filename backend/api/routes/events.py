@@ -0,0 +1,121 @@
+"""
+Event Stream Routes
+
+Server-sent events for live dashboards (awards, deposits, interest, raffle).
+"""
+import json
+import queue
+import time
+
+from flask import Blueprint, Response, current_app, jsonify, request, session
+
+from api import db
+from api.events import hub, tail
+from api.middleware import login_required, current_identity
+from api.models import User, UserRole
+from api.sessions import is_revoked
+
+events_bp = Blueprint('events', __name__)
+
+
+def _format(event):
+    """Encode an event dict as one SSE message."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def _session_valid(user_id, session_version):
+    """Recheck an open stream's session against the user row."""
+    user = db.session.get(User, user_id)
+    return user is not None and user.is_active and user.session_version == session_version
+
+
+def _class_roster(class_name):
+    """Ids of the students currently in `class_name`."""
+    return {user_id for (user_id,) in db.session.query(User.id).filter(
+        User.role == UserRole.STUDENT,
+        User.class_name == class_name
+    )}
+
+
+@events_bp.route('', methods=['GET'])
+@login_required
+def stream_events():
+    """
+    Stream ledger events as text/event-stream.
+    
+    Students receive events for their own account. Teachers and admins receive
+    every event, or only their class's with ?class_name=5A, plus a "roster"
+    event when students change.
+    
+    Event names: award, deposit, spend, interest, raffle, roster, resync
+    ("resync" means events were dropped and the client should refetch) and
+    revoked (the session was revoked; the stream then ends).
+    
+    The session is rechecked on every heartbeat and event, against the user
+    row at most every AUTH_REVALIDATE_SECONDS.
+    """
+    user_id, role = current_identity()
+    session_version = session.get('session_version')
+    class_name = request.args.get('class_name') if role != UserRole.STUDENT else None
+    
+    if hub.subscriber_count() >= current_app.config['SSE_MAX_SUBSCRIBERS']:
+        return jsonify({'success': False, 'error': 'Too many live connections, poll instead'}), 503
+    
+    app = current_app._get_current_object()
+    heartbeat = current_app.config['SSE_HEARTBEAT_SECONDS']
+    revalidate = current_app.config['AUTH_REVALIDATE_SECONDS']
+    roster = _class_roster(class_name) if class_name else None
+    subscription = tail.subscribe(app)
+    validated_at = time.monotonic()
+    
+    def wants(event):
+        if event['event'] == 'roster':
+            return role != UserRole.STUDENT
+        if role == UserRole.STUDENT:
+            return event['data']['userId'] == user_id
+        return roster is None or event['data']['userId'] in roster
+    
+    def still_valid():
+        nonlocal validated_at
+        if is_revoked(user_id, session_version):
+            return False
+        if time.monotonic() - validated_at < revalidate:
+            return True
+        with app.app_context():
+            valid = _session_valid(user_id, session_version)
+        validated_at = time.monotonic()
+        return valid
+    
+    def generate():
+        nonlocal roster
+        try:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while True:
+                try:
+                    event = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    event = None
+                if not still_valid():
+                    yield _format({'event': 'revoked', 'data': {}})
+                    return
+                if event is None:
+                    yield ": keepalive\n\n"  # Also detects closed connections
+                    continue
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield _format({'event': 'resync', 'data': {}})
+                if event['event'] == 'roster' and roster is not None:
+                    with app.app_context():
+                        roster = _class_roster(class_name)
+                if wants(event):
+                    yield _format(event)
+        finally:
+            hub.unsubscribe(subscription)
+    
+    # The generator runs after the request context is gone and holds no DB
+    # connection between events; it opens an app context only to reload the
+    # roster or recheck the session
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
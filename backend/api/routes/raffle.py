@@ -6,10 +6,12 @@ Conduct raffle draws and view history.
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 import random
+from sqlalchemy.orm import joinedload
 
 from api import db
 from api.models import User, Transaction, TransactionType, UserRole, RaffleDraw, SystemConfig
-from api.middleware import teacher_required, get_current_user
+from api.middleware import teacher_required, current_identity
+from api.http_cache import conditional_get
 
 raffle_bp = Blueprint('raffle', __name__)
 
@@ -18,7 +20,8 @@ raffle_bp = Blueprint('raffle', __name__)
 @teacher_required
 def conduct_draw():
     """
-    Conduct a raffle draw. Randomly selects a winner from all active students.
+    Conduct a raffle draw. Randomly selects a winner from all active students,
+    loading only the winner.
     
     Request body:
     {
@@ -27,7 +30,7 @@ def conduct_draw():
     }
     """
     data = request.get_json() or {}
-    current_user = get_current_user()
+    current_user_id = current_identity()[0]
     
     # Get prize amount (from request or default)
     prize_amount = data.get('prizeAmount')
@@ -39,21 +42,31 @@ def conduct_draw():
     
     prize_description = data.get('prizeDescription', '').strip()[:255] or 'Raffle Prize'
     
-    # Get all active students
-    students = User.query.filter_by(role=UserRole.STUDENT, is_active=True).all()
-    
-    if not students:
-        return jsonify({'success': False, 'error': 'No active students to draw from'}), 400
+    # Pick by position: count the eligible students, then fetch only the id at
+    # a random offset. Retried if the roster shrinks between the two queries.
+    eligible = db.session.query(User.id).filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    )
+    winner_id = None
+    for _ in range(3):
+        count = eligible.count()
+        if not count:
+            return jsonify({'success': False, 'error': 'No active students to draw from'}), 400
+        winner_id = eligible.order_by(User.id).offset(random.randrange(count)).limit(1).scalar()
+        if winner_id is not None:
+            break
+    if winner_id is None:
+        return jsonify({'success': False, 'error': 'Roster changed during the draw, try again'}), 409
     
-    # Random selection
-    winner = random.choice(students)
+    winner = db.session.get(User, winner_id)
     
     # Create raffle draw record
     raffle = RaffleDraw(
         winner_id=winner.id,
         prize_amount=prize_amount,
         prize_description=prize_description,
-        conducted_by_id=current_user.id
+        conducted_by_id=current_user_id
     )
     db.session.add(raffle)
     
@@ -63,13 +76,13 @@ def conduct_draw():
         amount=prize_amount,
         type=TransactionType.RAFFLE,
         notes=f"Raffle: {prize_description}",
-        created_by_id=current_user.id
+        created_by_id=current_user_id
     )
     db.session.add(transaction)
     
     db.session.commit()
-    db.session.refresh(winner)  # Ensure winner reflects committed transaction for balance calc
-
+    
+    # Balance is a primary-key read of account_balances, already including the prize
     return jsonify({
         'success': True,
         'raffle': raffle.to_dict(),
@@ -80,6 +93,7 @@ def conduct_draw():
 
 @raffle_bp.route('/history', methods=['GET'])
 @teacher_required
+@conditional_get('raffle', 'roster')
 def list_draws():
     """
     Get raffle draw history.
@@ -91,7 +105,8 @@ def list_draws():
     limit = min(request.args.get('limit', 20, type=int), 100)
     offset = request.args.get('offset', 0, type=int)
     
-    query = RaffleDraw.query.order_by(RaffleDraw.draw_date.desc())
+    # Winner names come from the page query rather than one lazy SELECT per draw
+    query = RaffleDraw.query.options(joinedload(RaffleDraw.winner)).order_by(RaffleDraw.draw_date.desc())
     
     total = query.count()
     draws = query.offset(offset).limit(limit).all()
@@ -5,9 +5,12 @@ CRUD operations for student management.
 Teachers can view and manage students.
 """
 from flask import Blueprint, request, jsonify
+from sqlalchemy import func
+
 from api import db
-from api.models import User, UserRole
+from api.models import User, UserRole, AccountBalance
 from api.middleware import teacher_required, get_current_user
+from api.http_cache import conditional_get
 
 students_bp = Blueprint('students', __name__)
 
@@ -25,16 +28,28 @@ def list_students():
     class_name = request.args.get('class_name')
     include_balance = request.args.get('include_balance', 'false').lower() == 'true'
     
-    query = User.query.filter_by(role=UserRole.STUDENT, is_active=True)
+    query = db.session.query(User).filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    )
     
     if class_name:
-        query = query.filter_by(class_name=class_name)
-    
-    students = query.order_by(User.last_name, User.first_name).all()
+        query = query.filter(User.class_name == class_name)
+    
+    if include_balance:
+        # Fetch balances in the same statement instead of one lookup per student
+        query = query.add_columns(
+            func.coalesce(AccountBalance.balance, 0)
+        ).outerjoin(AccountBalance, AccountBalance.user_id == User.id)
+        rows = query.order_by(User.last_name, User.first_name).all()
+        students = [s.to_dict(balance=balance) for s, balance in rows]
+    else:
+        rows = query.order_by(User.last_name, User.first_name).all()
+        students = [s.to_dict() for s in rows]
     
     return jsonify({
         'success': True,
-        'students': [s.to_dict(include_balance=include_balance) for s in students],
+        'students': students,
         'count': len(students)
     })
 
@@ -148,6 +163,7 @@ def update_student(student_id):
 
 @students_bp.route('/classes', methods=['GET'])
 @teacher_required
+@conditional_get('roster')
 def list_classes():
     """Get list of all unique class names."""
     classes = db.session.query(User.class_name).filter(
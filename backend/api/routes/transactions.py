@@ -4,13 +4,26 @@ Transactions Routes
 Award, deposit, and view transaction history.
 Core banking operations for DB$.
 """
+import base64
+import binascii
+import io
+import json
+from datetime import datetime
+
 from flask import Blueprint, request, jsonify
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+
 from api import db
-from api.models import User, Transaction, TransactionType, UserRole, FocusBehavior
-from api.middleware import teacher_required, login_required, get_current_user
+from api.models import User, Transaction, TransactionType, UserRole, FocusBehavior, AccountBalance
+from api.middleware import teacher_required, login_required, current_identity
+from api.services.ledger import post_transactions
 
 transactions_bp = Blueprint('transactions', __name__)
 
+# Most students a single batch award may cover
+MAX_BATCH_AWARD = 1000
+
 
 @transactions_bp.route('/award', methods=['POST'])
 @teacher_required
@@ -28,7 +41,7 @@ def award_db_dollar():
     Note: Awards are ALWAYS exactly 1 DB$.
     """
     data = request.get_json()
-    current_user = get_current_user()
+    current_user_id = current_identity()[0]
     
     if not data or not data.get('studentId'):
         return jsonify({'success': False, 'error': 'studentId required'}), 400
@@ -56,7 +69,7 @@ def award_db_dollar():
         type=TransactionType.AWARD,
         category_id=behavior_id,
         notes=data.get('notes', '').strip()[:255] or None,
-        created_by_id=current_user.id
+        created_by_id=current_user_id
     )
     
     db.session.add(transaction)
@@ -69,6 +82,98 @@ def award_db_dollar():
     }), 201
 
 
+@transactions_bp.route('/award/batch', methods=['POST'])
+@teacher_required
+def award_db_dollar_batch():
+    """
+    Award 1 DB$ to each of many students (a table group or a whole class).
+    
+    Request body:
+    {
+        "studentIds": [123, 124, 125],  // or:
+        "className": "5A",              // every active student in the class
+        "behaviorId": 1,  // optional, FK to focus_behaviors
+        "notes": "Great teamwork!"  // optional
+    }
+    
+    All-or-nothing: if any student id is unknown or inactive, nothing is awarded.
+    """
+    data = request.get_json()
+    current_user_id = current_identity()[0]
+    
+    if not data or not (data.get('studentIds') or data.get('className')):
+        return jsonify({'success': False, 'error': 'studentIds or className required'}), 400
+    
+    query = User.query.filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    )
+    
+    student_ids = data.get('studentIds')
+    if student_ids:
+        if not isinstance(student_ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in student_ids
+        ):
+            return jsonify({'success': False, 'error': 'studentIds must be an array of integers'}), 400
+        student_ids = list(dict.fromkeys(student_ids))  # De-duplicate, keep order
+        if len(student_ids) > MAX_BATCH_AWARD:
+            return jsonify({'success': False, 'error': f'Maximum {MAX_BATCH_AWARD} students per batch'}), 400
+        
+        # Validate every student in one query
+        found = {uid for (uid,) in query.with_entities(User.id).filter(User.id.in_(student_ids))}
+        missing = [uid for uid in student_ids if uid not in found]
+        if missing:
+            return jsonify({
+                'success': False,
+                'error': 'Student not found',
+                'missingStudentIds': missing
+            }), 404
+    else:
+        student_ids = [uid for (uid,) in query.with_entities(User.id).filter(
+            User.class_name == data['className']
+        ).order_by(User.id)]
+        if not student_ids:
+            return jsonify({'success': False, 'error': 'No active students in class'}), 404
+    
+    # Validate behavior if provided
+    behavior_id = data.get('behaviorId')
+    if behavior_id:
+        behavior = FocusBehavior.query.get(behavior_id)
+        if not behavior:
+            return jsonify({'success': False, 'error': 'Behavior not found'}), 404
+    
+    notes = data.get('notes', '').strip()[:255] or None
+    
+    # All AWARD rows in one transaction (always 1 DB$ each)
+    post_transactions([
+        {
+            'user_id': student_id,
+            'amount': 1,
+            'type': TransactionType.AWARD,
+            'category_id': behavior_id,
+            'notes': notes,
+            'created_by_id': current_user_id
+        }
+        for student_id in student_ids
+    ])
+    db.session.commit()
+    
+    # New balances in one aggregate read
+    balances = dict(db.session.query(AccountBalance.user_id, AccountBalance.balance).filter(
+        AccountBalance.user_id.in_(student_ids)
+    ).all())
+    
+    return jsonify({
+        'success': True,
+        'awarded': len(student_ids),
+        'behaviorId': behavior_id,
+        'balances': [
+            {'studentId': student_id, 'newBalance': balances.get(student_id, 0)}
+            for student_id in student_ids
+        ]
+    }), 201
+
+
 @transactions_bp.route('/deposit', methods=['POST'])
 @teacher_required
 def deposit_tokens():
@@ -83,7 +188,7 @@ def deposit_tokens():
     }
     """
     data = request.get_json()
-    current_user = get_current_user()
+    current_user_id = current_identity()[0]
     
     if not data:
         return jsonify({'success': False, 'error': 'No data provided'}), 400
@@ -111,7 +216,7 @@ def deposit_tokens():
         amount=amount,
         type=TransactionType.DEPOSIT,
         notes=data.get('notes', '').strip()[:255] or None,
-        created_by_id=current_user.id
+        created_by_id=current_user_id
     )
     
     db.session.add(transaction)
@@ -124,32 +229,82 @@ def deposit_tokens():
     }), 201
 
 
+@transactions_bp.route('/deposit/import', methods=['POST'])
+@teacher_required
+def import_deposits():
+    """
+    Bulk-import token deposits, streamed from the request body.
+    
+    Content-Type text/csv:
+        studentId,amount,notes      (or username instead of studentId)
+        123,5,Week 6 cash-in
+    
+    Content-Type application/x-ndjson (one object per line):
+        {"studentId": 123, "amount": 5, "notes": "Week 6 cash-in"}
+    
+    Invalid rows are skipped and reported; valid rows are written in chunks.
+    An upload that turns unreadable part-way (not UTF-8, malformed CSV) gets
+    a 400 with the summary of the rows imported before that point.
+    """
+    from api.services import deposit_import
+    
+    current_user_id = current_identity()[0]
+    content_type = request.mimetype
+    stream = io.BufferedReader(request.stream)
+    
+    if content_type == 'text/csv':
+        rows = deposit_import.iter_csv_rows(stream)
+    elif content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+        rows = deposit_import.iter_jsonl_rows(stream)
+    else:
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type must be text/csv or application/x-ndjson'
+        }), 415
+    
+    try:
+        summary = deposit_import.import_deposits(rows, created_by_id=current_user_id)
+    except deposit_import.ImportFormatError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Unreadable part-way: rows before the error were imported, and the summary says how many
+    if not summary['success']:
+        return jsonify(summary), 400
+    
+    return jsonify(summary)
+
+
 @transactions_bp.route('', methods=['GET'])
 @login_required
 def list_transactions():
     """
-    Get transaction history.
+    Get transaction history, newest first.
     
     Query params:
     - user_id: Filter by specific user (teachers only)
     - type: Filter by transaction type
     - limit: Number of records (default 50)
-    - offset: Pagination offset
+    - cursor: Opaque `nextCursor` from the previous page
+    - include_total: If "true", also count the whole filtered history
+    - offset: Legacy offset pagination (used only when no cursor is given)
     
     Students can only see their own transactions.
     Teachers can see all transactions.
     """
-    current_user = get_current_user()
+    current_user_id, current_role = current_identity()
     user_id = request.args.get('user_id', type=int)
     tx_type = request.args.get('type')
     limit = min(request.args.get('limit', 50, type=int), 200)
     offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
     
     # Students can only see their own
-    if current_user.role == UserRole.STUDENT:
-        user_id = current_user.id
+    if current_role == UserRole.STUDENT:
+        user_id = current_user_id
     
-    query = Transaction.query
+    # Load category names in the page query rather than one lazy SELECT per row
+    query = Transaction.query.options(joinedload(Transaction.category))
     
     if user_id:
         query = query.filter_by(user_id=user_id)
@@ -160,13 +315,54 @@ def list_transactions():
         except ValueError:
             pass  # Invalid type, ignore filter
     
-    total = query.count()
-    transactions = query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit).all()
+    total = query.count() if include_total else None
     
-    return jsonify({
+    query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+    
+    # Keyset pagination on (created_at, id): each page is an index range scan
+    if cursor:
+        try:
+            after_created_at, after_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        query = query.filter(
+            tuple_(Transaction.created_at, Transaction.id) < (after_created_at, after_id)
+        )
+    elif offset:
+        query = query.offset(offset)
+    
+    transactions = query.limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = _encode_cursor(transactions[-1])
+    
+    response = {
         'success': True,
         'transactions': [t.to_dict() for t in transactions],
-        'total': total,
         'limit': limit,
-        'offset': offset
-    })
+        'nextCursor': next_cursor
+    }
+    if total is not None:
+        response['total'] = total
+    if offset and not cursor:
+        response['offset'] = offset
+    
+    return jsonify(response)
+
+
+def _encode_cursor(transaction):
+    """Opaque page token for the position after `transaction`."""
+    raw = json.dumps([transaction.created_at.isoformat(), transaction.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """Inverse of _encode_cursor. Raises ValueError on a malformed token."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
@@ -3,15 +3,80 @@ Background Scheduler
 
 Schedules daily snapshots and weekly interest calculations.
 Uses APScheduler.
+
+Under Gunicorn every worker calls init_scheduler, so the scheduled jobs are
+guarded by a leader lock (an exclusive file lock in the instance folder):
+exactly one process runs them, and the others keep retrying the lock so a
+replacement takes over if the leader exits.
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import atexit
+import os
+
+try:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 scheduler = BackgroundScheduler()
 
 
+class LeaderLock:
+    """
+    Non-blocking exclusive lock on a file, held for the life of the process.
+    The OS releases it automatically if the process dies.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    @property
+    def held(self) -> bool:
+        """True if this process is the leader."""
+        return self._file is not None
+    
+    def try_acquire(self) -> bool:
+        """Take the lock if no other process holds it. Never blocks."""
+        if self._file is not None:
+            return True
+        f = open(self.path, 'a+')
+        try:
+            _lock_file(f)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+    
+    def release(self):
+        """Give up leadership."""
+        if self._file is None:
+            return
+        try:
+            _unlock_file(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+
+
 def init_scheduler(app):
     """Initialize and start the background scheduler."""
     
@@ -19,8 +84,11 @@ def init_scheduler(app):
         """Run daily snapshot with app context."""
         with app.app_context():
             from api.services.interest import take_daily_snapshot
-            count = take_daily_snapshot()
-            print(f"[Scheduler] Daily snapshot complete: {count} snapshots created")
+            result = take_daily_snapshot()
+            print(
+                f"[Scheduler] Daily snapshot complete: {result['snapshotsCreated']} snapshots "
+                f"created in {result['durationMs']}ms"
+            )
     
     def weekly_interest_job():
         """Run weekly interest calculation with app context."""
@@ -29,28 +97,56 @@ def init_scheduler(app):
             result = calculate_weekly_interest()
             print(f"[Scheduler] Weekly interest complete: {result}")
     
-    # Daily snapshot at 23:55 every day
-    scheduler.add_job(
-        daily_snapshot_job,
-        trigger=CronTrigger(hour=23, minute=55),
-        id='daily_snapshot',
-        name='Daily Balance Snapshot',
-        replace_existing=True
-    )
-    
-    # Weekly interest calculation at 23:59 every Sunday
-    scheduler.add_job(
-        weekly_interest_job,
-        trigger=CronTrigger(day_of_week='sun', hour=23, minute=59),
-        id='weekly_interest',
-        name='Weekly Interest Calculation',
-        replace_existing=True
-    )
+    def add_jobs():
+        """Schedule the real jobs (leader only)."""
+        # Daily snapshot at 23:55 every day
+        scheduler.add_job(
+            daily_snapshot_job,
+            trigger=CronTrigger(hour=23, minute=55),
+            id='daily_snapshot',
+            name='Daily Balance Snapshot',
+            replace_existing=True
+        )
+        
+        # Weekly interest calculation at 23:59 every Sunday
+        scheduler.add_job(
+            weekly_interest_job,
+            trigger=CronTrigger(day_of_week='sun', hour=23, minute=59),
+            id='weekly_interest',
+            name='Weekly Interest Calculation',
+            replace_existing=True
+        )
+    
+    leader_lock = LeaderLock(app.config['SCHEDULER_LOCK_FILE'])
+    
+    def leader_election_job():
+        """Followers retry the lock so a new leader takes over if the old one exits."""
+        if leader_lock.try_acquire():
+            scheduler.remove_job('leader_election')
+            add_jobs()
+            print(f"[Scheduler] Process {os.getpid()} became scheduler leader")
+    
+    if leader_lock.try_acquire():
+        add_jobs()
+        role = 'leader'
+    else:
+        scheduler.add_job(
+            leader_election_job,
+            trigger=IntervalTrigger(seconds=app.config['SCHEDULER_ELECTION_INTERVAL']),
+            id='leader_election',
+            name='Scheduler Leader Election',
+            replace_existing=True
+        )
+        role = 'follower'
     
     # Start scheduler
     scheduler.start()
     
-    # Shut down scheduler when app exits
-    atexit.register(lambda: scheduler.shutdown(wait=False))
+    # Shut down scheduler and release leadership when app exits
+    def shutdown():
+        scheduler.shutdown(wait=False)
+        leader_lock.release()
+    
+    atexit.register(shutdown)
     
-    print("[Scheduler] Background scheduler initialized")
+    print(f"[Scheduler] Background scheduler initialized (process {os.getpid()}, {role})")
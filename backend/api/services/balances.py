@@ -0,0 +1,67 @@
+"""
+Balance Reconciliation Service
+
+Checks the materialized account_balances table against the transaction ledger
+and rebuilds it when they disagree.
+"""
+from datetime import datetime
+from sqlalchemy import func, literal, select
+
+from api import db
+from api.models import AccountBalance, Transaction
+
+
+def reconcile_balances(repair=True):
+    """
+    Compare every stored balance with SUM(amount) from the ledger.
+
+    When `repair` is true and any drift is found, account_balances is rebuilt
+    from the ledger in a single transaction.
+
+    Returns a summary dict with the drifted users.
+    """
+    ledger = dict(
+        db.session.query(Transaction.user_id, func.sum(Transaction.amount))
+        .group_by(Transaction.user_id)
+        .all()
+    )
+    stored = dict(db.session.query(AccountBalance.user_id, AccountBalance.balance).all())
+
+    drift = []
+    for user_id in sorted(set(ledger) | set(stored)):
+        expected = ledger.get(user_id)
+        actual = stored.get(user_id)
+        if expected != actual:
+            drift.append({
+                'userId': user_id,
+                'ledgerBalance': expected,
+                'storedBalance': actual
+            })
+
+    repaired = False
+    if repair and drift:
+        rebuild_balances()
+        repaired = True
+
+    return {
+        'success': True,
+        'usersChecked': len(set(ledger) | set(stored)),
+        'drift': drift,
+        'repaired': repaired
+    }
+
+
+def rebuild_balances():
+    """Replace account_balances with fresh sums from the ledger."""
+    db.session.query(AccountBalance).delete()
+    db.session.execute(
+        AccountBalance.__table__.insert().from_select(
+            ['user_id', 'balance', 'updated_at'],
+            select(
+                Transaction.user_id,
+                func.sum(Transaction.amount),
+                literal(datetime.utcnow(), db.DateTime)
+            ).group_by(Transaction.user_id)
+        )
+    )
+    db.session.commit()
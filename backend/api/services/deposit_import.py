@@ -0,0 +1,178 @@
+"""
+Deposit Import Service
+
+Bulk import of physical-token deposits (the weekly cash-in) from CSV or
+JSON lines. Rows are read from a stream, validated against the roster a
+chunk at a time and written in chunked batches, so memory stays bounded
+however large the upload is.
+"""
+import csv
+import io
+import json
+
+from sqlalchemy import or_
+
+from api import db
+from api.models import User, UserRole, TransactionType
+from api.services.ledger import post_transactions
+
+
+# Rows validated and written per batch (one roster query + one insert each)
+IMPORT_CHUNK_SIZE = 500
+
+# Per-row errors returned in the response; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be parsed at all (e.g. a CSV header without the required columns)."""
+
+
+def iter_csv_rows(stream):
+    """
+    Yield (row_number, dict) from a CSV byte stream.
+    Header must include `amount` and one of `studentId` / `username`; `notes` is optional.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    fields = set(reader.fieldnames or [])
+    if 'amount' not in fields or not fields & {'studentId', 'username'}:
+        raise ImportFormatError('CSV header must include amount and studentId or username')
+    for row_number, row in enumerate(reader, start=2):  # Row 1 is the header
+        yield row_number, row
+
+
+def iter_jsonl_rows(stream):
+    """Yield (line_number, dict) from a JSON-lines byte stream, skipping blank lines."""
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _parse_amount(value):
+    """Positive integer amount from a CSV string or JSON number, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isdigit():
+            return None
+        value = int(value)
+    if not isinstance(value, int) or value <= 0:
+        return None
+    return value
+
+
+def _parse_student_id(value):
+    """Integer student id from a CSV string or JSON number, else None."""
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def import_deposits(rows, created_by_id):
+    """
+    Validate and write DEPOSIT transactions from (row_number, dict) pairs.
+
+    Each chunk is committed on its own so a long upload never holds the
+    database write lock for its whole duration. If the stream stops being
+    readable part-way (not UTF-8, malformed CSV), the rows read so far are
+    still written and the summary comes back with success False and an
+    `error` naming the last row read.
+
+    Returns a summary dict including per-row errors.
+    """
+    summary = {
+        'success': True,
+        'rowsRead': 0,
+        'imported': 0,
+        'totalAmount': 0,
+        'errorCount': 0,
+        'errors': []
+    }
+
+    def add_error(row_number, message):
+        summary['errorCount'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'row': row_number, 'error': message})
+
+    chunk = []
+    last_row = 0
+    try:
+        for row_number, row in rows:
+            last_row = row_number
+            summary['rowsRead'] += 1
+            if row is None:
+                add_error(row_number, 'Invalid JSON object')
+                continue
+            chunk.append((row_number, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _write_chunk(chunk, created_by_id, summary, add_error)
+                chunk = []
+    except UnicodeDecodeError:
+        summary['success'] = False
+        summary['error'] = f'Upload is not UTF-8 text; stopped after row {last_row}'
+    except csv.Error as e:
+        summary['success'] = False
+        summary['error'] = f'Malformed CSV after row {last_row}: {e}'
+    if chunk:
+        _write_chunk(chunk, created_by_id, summary, add_error)
+
+    return summary
+
+
+def _write_chunk(chunk, created_by_id, summary, add_error):
+    """Validate one chunk against the roster in bulk and post its deposits."""
+    ids = set()
+    usernames = set()
+    for _, row in chunk:
+        student_id = _parse_student_id(row.get('studentId'))
+        if student_id is not None:
+            ids.add(student_id)
+        elif row.get('username'):
+            usernames.add(str(row['username']).strip().lower())
+
+    roster = User.query.with_entities(User.id, User.username).filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True,
+        or_(User.id.in_(ids), User.username.in_(usernames))
+    ).all()
+    known_ids = {user_id for user_id, _ in roster}
+    id_by_username = {username: user_id for user_id, username in roster}
+
+    transactions = []
+    for row_number, row in chunk:
+        student_id = _parse_student_id(row.get('studentId'))
+        if student_id is None and row.get('username'):
+            student_id = id_by_username.get(str(row['username']).strip().lower())
+        elif student_id not in known_ids:
+            student_id = None
+        if student_id is None:
+            add_error(row_number, 'Student not found')
+            continue
+
+        amount = _parse_amount(row.get('amount'))
+        if amount is None:
+            add_error(row_number, 'Amount must be a positive integer')
+            continue
+
+        transactions.append({
+            'user_id': student_id,
+            'amount': amount,
+            'type': TransactionType.DEPOSIT,
+            'notes': (str(row.get('notes') or '').strip()[:255]) or None,
+            'created_by_id': created_by_id
+        })
+
+    post_transactions(transactions)
+    db.session.commit()
+
+    summary['imported'] += len(transactions)
+    summary['totalAmount'] += sum(t['amount'] for t in transactions)
@@ -4,73 +4,103 @@ Interest Calculation Service
 Weekly interest on minimum balance.
 """
 from datetime import datetime, timedelta, date
-from sqlalchemy import func
+import time
+from sqlalchemy import func, literal, select
+from sqlalchemy.exc import IntegrityError
 
 from api import db
-from api.models import User, Transaction, TransactionType, UserRole, DailySnapshot, SystemConfig
+from api.models import (
+    User, Transaction, TransactionType, UserRole, DailySnapshot, SystemConfig, AccountBalance,
+    InterestRun, InterestRunStatus,
+)
+from api.services.ledger import post_transactions
+from api.sql import upsert_insert
 
 
+# Students paid per committed chunk; a crashed run loses at most one chunk of work
+RUN_CHUNK_SIZE = 200
+
+# A RUNNING run whose heartbeat is older than this is assumed dead and may be resumed
+STALE_RUN_AFTER = timedelta(minutes=10)
+
 def take_daily_snapshot():
     """
     Capture daily balance snapshot for all students.
     Should run at end of each day.
+    
+    Runs as one INSERT ... SELECT over the materialized balances; students that
+    already have a snapshot for today are skipped via ON CONFLICT DO NOTHING.
     """
+    started = time.perf_counter()
     today = date.today()
     
-    students = User.query.filter_by(role=UserRole.STUDENT, is_active=True).all()
+    balances = select(
+        User.id,
+        literal(today, db.Date),
+        func.coalesce(AccountBalance.balance, 0)
+    ).select_from(User).outerjoin(
+        AccountBalance, AccountBalance.user_id == User.id
+    ).where(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    )
     
-    snapshots_created = 0
-    for student in students:
-        # Check if snapshot already exists for today
-        existing = DailySnapshot.query.filter_by(user_id=student.id, date=today).first()
-        if existing:
-            continue
-        
-        snapshot = DailySnapshot(
-            user_id=student.id,
-            date=today,
-            balance_at_snapshot=student.balance
-        )
-        db.session.add(snapshot)
-        snapshots_created += 1
+    stmt = upsert_insert(db.session, DailySnapshot.__table__).from_select(
+        ['user_id', 'date', 'balance_at_snapshot'], balances
+    ).on_conflict_do_nothing(index_elements=['user_id', 'date'])
     
+    result = db.session.execute(stmt)
     db.session.commit()
-    return snapshots_created
+    
+    return {
+        'success': True,
+        'date': today.isoformat(),
+        'snapshotsCreated': result.rowcount,
+        'durationMs': round((time.perf_counter() - started) * 1000, 2)
+    }
 
 
-def calculate_weekly_interest():
-    """
-    Calculate and apply weekly interest based on minimum balance.
-    Should run every Sunday at 23:59 (or configured day).
-    
-    Interest = (minimum_weekly_balance * interest_rate) / 100
+def plan_weekly_interest(interest_rate, today=None):
     """
-    # Get interest rate from config
-    interest_rate = float(SystemConfig.get('interest_rate', '2.0'))
+    Compute this week's interest for every active student without writing anything.
     
-    if interest_rate <= 0:
-        return {'skipped': True, 'reason': 'Interest rate is 0'}
+    Minimum weekly balances come from one grouped query over daily_snapshots,
+    joined to the roster and the materialized balances (used as the fallback
+    when a student has no snapshots this week).
     
-    # Calculate date range for this week
-    today = date.today()
+    Returns a list of per-student plan entries, ordered by user id.
+    """
+    today = today or date.today()
     week_start = today - timedelta(days=7)
     
-    students = User.query.filter_by(role=UserRole.STUDENT, is_active=True).all()
+    weekly_min = db.session.query(
+        DailySnapshot.user_id.label('user_id'),
+        func.min(DailySnapshot.balance_at_snapshot).label('min_balance')
+    ).filter(
+        DailySnapshot.date >= week_start,
+        DailySnapshot.date <= today
+    ).group_by(DailySnapshot.user_id).subquery()
     
-    interest_applied = 0
-    total_interest_amount = 0
+    rows = db.session.query(
+        User.id,
+        User.first_name,
+        User.last_name,
+        weekly_min.c.min_balance,
+        func.coalesce(AccountBalance.balance, 0)
+    ).outerjoin(
+        weekly_min, weekly_min.c.user_id == User.id
+    ).outerjoin(
+        AccountBalance, AccountBalance.user_id == User.id
+    ).filter(
+        User.role == UserRole.STUDENT,
+        User.is_active == True
+    ).order_by(User.id).all()
     
-    for student in students:
-        # Get minimum balance from snapshots this week
-        min_balance = db.session.query(func.min(DailySnapshot.balance_at_snapshot)).filter(
-            DailySnapshot.user_id == student.id,
-            DailySnapshot.date >= week_start,
-            DailySnapshot.date <= today
-        ).scalar()
-        
+    plan = []
+    for user_id, first_name, last_name, min_balance, current_balance in rows:
         # If no snapshots, use current balance as fallback
         if min_balance is None:
-            min_balance = student.balance
+            min_balance = current_balance
         
         # Only apply interest on positive balances
         if min_balance <= 0:
@@ -82,24 +112,200 @@ def calculate_weekly_interest():
         if interest_amount <= 0:
             continue
         
-        # Create interest transaction
-        transaction = Transaction(
-            user_id=student.id,
-            amount=interest_amount,
-            type=TransactionType.INTEREST,
-            notes=f"Weekly interest ({interest_rate}% on min balance {min_balance})",
-            created_by_id=None  # System-generated
+        plan.append({
+            'userId': user_id,
+            'name': f"{first_name} {last_name}",
+            'minBalance': min_balance,
+            'interest': interest_amount
+        })
+    
+    return plan
+
+
+def week_key(day):
+    """ISO week identifier for `day`, e.g. "2026-W42"."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_end(week):
+    """Last day (Sunday) of an ISO week key, the day its scheduled run fires."""
+    year, number = week.split('-W')
+    return date.fromisocalendar(int(year), int(number), 7)
+
+
+def is_interest_day(day):
+    """True if `day` is the configured interest day (SystemConfig interest_day)."""
+    return day.strftime('%A').lower() == SystemConfig.get('interest_day', 'sunday').strip().lower()
+
+
+def unfinished_run():
+    """The latest run that failed or stopped heartbeating (and so must be resumed), else None."""
+    stale_before = datetime.utcnow() - STALE_RUN_AFTER
+    return InterestRun.query.filter(
+        (InterestRun.status == InterestRunStatus.FAILED)
+        | ((InterestRun.status == InterestRunStatus.RUNNING) & (InterestRun.heartbeat_at <= stale_before))
+    ).order_by(InterestRun.week.desc()).first()
+
+
+def _claim_run(week, interest_rate):
+    """
+    Take ownership of this week's interest run.
+    
+    Creates the run if it does not exist, or takes over a failed run or one whose
+    heartbeat has gone stale (the process running it crashed). Returns None if the
+    week is already paid or another process is actively paying it.
+    """
+    now = datetime.utcnow()
+    run = InterestRun.query.filter_by(week=week).first()
+    
+    if run is None:
+        run = InterestRun(
+            week=week,
+            status=InterestRunStatus.RUNNING,
+            interest_rate=interest_rate,
+            started_at=now,
+            heartbeat_at=now
         )
-        db.session.add(transaction)
-        
-        interest_applied += 1
-        total_interest_amount += interest_amount
+        db.session.add(run)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another process created the run first
+            db.session.rollback()
+            return None
+        return run
     
-    db.session.commit()
+    if run.status == InterestRunStatus.COMPLETED:
+        return None
+    if run.status == InterestRunStatus.RUNNING and run.heartbeat_at > now - STALE_RUN_AFTER:
+        return None
     
-    return {
+    # Compare-and-set so only one process resumes a failed or stale run
+    claimed = InterestRun.query.filter(
+        InterestRun.id == run.id,
+        InterestRun.status == run.status,
+        InterestRun.heartbeat_at == run.heartbeat_at
+    ).update({
+        'status': InterestRunStatus.RUNNING,
+        'heartbeat_at': now,
+        'error': None
+    }, synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        return None
+    db.session.refresh(run)
+    return run
+
+
+def _run_summary(run, **extra):
+    """Result dict for a run, in the shape returned by calculate_weekly_interest."""
+    summary = {
         'success': True,
-        'studentsReceivingInterest': interest_applied,
-        'totalInterestDistributed': total_interest_amount,
-        'interestRate': interest_rate
+        'studentsReceivingInterest': run.student_count,
+        'totalInterestDistributed': run.total_paid,
+        'interestRate': run.interest_rate,
+        'week': run.week,
+        'run': run.to_dict()
     }
+    summary.update(extra)
+    return summary
+
+
+def calculate_weekly_interest(dry_run=False, today=None):
+    """
+    Calculate and apply weekly interest based on minimum balance.
+    Should run every Sunday at 23:59 (or configured day).
+    
+    Interest = (minimum_weekly_balance * interest_rate) / 100
+    
+    Each ISO week is paid at most once: the payout is tracked in interest_runs and
+    written in chunks, so a rerun of a completed week is a no-op and a crashed or
+    failed run resumes with the students it has not paid yet. A run is keyed by
+    the week it pays, not the day it executes: while a failed or stale run
+    exists, the next call resumes that week (planned as of its Sunday at the
+    latest), so a
+    Sunday-night crash retried on Monday still pays the Sunday's week.
+    
+    With `dry_run`, returns the full per-student plan without writing.
+    """
+    today = today or date.today()
+    
+    # Get interest rate from config
+    interest_rate = float(SystemConfig.get('interest_rate', '2.0'))
+    
+    if interest_rate <= 0:
+        return {'skipped': True, 'reason': 'Interest rate is 0'}
+    
+    if dry_run:
+        plan = plan_weekly_interest(interest_rate, today)
+        return {
+            'success': True,
+            'dryRun': True,
+            'studentsReceivingInterest': len(plan),
+            'totalInterestDistributed': sum(entry['interest'] for entry in plan),
+            'interestRate': interest_rate,
+            'week': week_key(today),
+            'plan': plan
+        }
+    
+    unfinished = unfinished_run()
+    if unfinished is not None:
+        week = unfinished.week
+        today = min(today, week_end(week))
+    else:
+        week = week_key(today)
+    run = _claim_run(week, interest_rate)
+    
+    if run is None:
+        existing = InterestRun.query.filter_by(week=week).first()
+        reason = (
+            f'Interest already paid for {week}'
+            if existing and existing.status == InterestRunStatus.COMPLETED
+            else f'Interest run for {week} is in progress'
+        )
+        return {'skipped': True, 'reason': reason, 'run': existing.to_dict() if existing else None}
+    
+    resumed = run.student_count > 0
+    
+    try:
+        # Students already paid by an earlier attempt at this run
+        paid_ids = {
+            user_id for (user_id,) in db.session.query(Transaction.user_id).filter(
+                Transaction.type == TransactionType.INTEREST,
+                Transaction.created_at >= run.started_at
+            )
+        }
+        plan = [
+            entry for entry in plan_weekly_interest(run.interest_rate, today)
+            if entry['userId'] not in paid_ids
+        ]
+        
+        for start in range(0, len(plan), RUN_CHUNK_SIZE):
+            chunk = plan[start:start + RUN_CHUNK_SIZE]
+            post_transactions([
+                {
+                    'user_id': entry['userId'],
+                    'amount': entry['interest'],
+                    'type': TransactionType.INTEREST,
+                    'notes': f"Weekly interest ({run.interest_rate}% on min balance {entry['minBalance']})",
+                    'created_by_id': None  # System-generated
+                }
+                for entry in chunk
+            ])
+            run.student_count += len(chunk)
+            run.total_paid += sum(entry['interest'] for entry in chunk)
+            run.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+        
+        run.status = InterestRunStatus.COMPLETED
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        run.status = InterestRunStatus.FAILED
+        run.error = str(e)[:255]
+        db.session.commit()
+        raise
+    
+    return _run_summary(run, resumed=resumed)
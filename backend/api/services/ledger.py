@@ -0,0 +1,44 @@
+"""
+Ledger Service
+
+Bulk writes to the transaction ledger for jobs and endpoints that post many
+rows at once (interest runs, batch awards, deposit imports).
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from api import db
+from api.models import Transaction, AccountBalance, DailyActivityRollup, ResourceVersion
+from api.signals import record_ledger_rows
+
+
+def post_transactions(rows):
+    """
+    Insert many ledger rows with one executemany and apply their balance
+    deltas, daily rollups and the "ledger" resource version.
+
+    `rows` are dicts of Transaction column values (user_id, amount, type, ...).
+    Runs inside the caller's DB transaction; the caller commits.
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault('created_at', now)
+
+    # Core insert: bypasses per-row ORM bookkeeping (and the after_insert
+    # aggregate listener, so balances and rollups are upserted here instead)
+    db.session.execute(Transaction.__table__.insert(), rows)
+
+    deltas = defaultdict(int)
+    for row in rows:
+        deltas[row['user_id']] += row['amount']
+    AccountBalance.apply_deltas(db.session.connection(), deltas)
+    DailyActivityRollup.apply(db.session.connection(), rows)
+    # The ORM after_flush hook (api.http_cache) does not see Core inserts
+    ResourceVersion.bump(db.session.connection(), ['ledger'])
+    record_ledger_rows(db.session, rows)
+
+    return len(rows)
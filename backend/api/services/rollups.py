@@ -0,0 +1,37 @@
+"""
+Activity Rollup Service
+
+Rebuilds the daily_activity_rollups table from the transaction ledger, e.g.
+after restoring a backup or editing ledger rows by hand. Like the write path,
+activity is attributed to each student's current class.
+"""
+from sqlalchemy import func, select
+
+from api import db
+from api.models import DailyActivityRollup, Transaction, User
+
+
+def rollup_select():
+    """SELECT producing every rollup row from the ledger (class from the current roster)."""
+    day = func.date(Transaction.created_at)
+    class_name = func.coalesce(User.class_name, DailyActivityRollup.NO_CLASS)
+    category_id = func.coalesce(Transaction.category_id, DailyActivityRollup.NO_CATEGORY)
+    return select(
+        day, class_name, Transaction.type, category_id,
+        func.count(Transaction.id), func.sum(Transaction.amount)
+    ).join(User, User.id == Transaction.user_id).group_by(
+        day, class_name, Transaction.type, category_id
+    )
+
+
+def rebuild_rollups():
+    """Replace daily_activity_rollups with fresh aggregates from the ledger. Returns the row count."""
+    db.session.query(DailyActivityRollup).delete()
+    db.session.execute(
+        DailyActivityRollup.__table__.insert().from_select(
+            ['date', 'class_name', 'type', 'category_id', 'tx_count', 'amount_total'],
+            rollup_select()
+        )
+    )
+    db.session.commit()
+    return db.session.query(func.count()).select_from(DailyActivityRollup).scalar()
@@ -0,0 +1,108 @@
+"""
+Trends Service
+
+Time series of awards, deposits, interest and circulation, bucketed by day,
+week or school term. Built from daily_activity_rollups, so a year-long chart
+reads at most a few hundred grouped rows however large the ledger is.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import case, func
+
+from api import db
+from api.models import DailyActivityRollup, SystemConfig, TransactionType
+
+
+PERIODS = ('day', 'week', 'term')
+
+# Default span per period when no start date is given
+DEFAULT_SPAN_DAYS = {'day': 30, 'week': 7 * 12, 'term': 365}
+
+# Longest range a single request may cover
+MAX_RANGE_DAYS = 366 * 5
+
+
+def term_start_dates():
+    """Configured term start dates (SystemConfig term_start_dates), sorted."""
+    return sorted(parse_term_start_dates(SystemConfig.get('term_start_dates', '') or ''))
+
+
+def parse_term_start_dates(raw):
+    """Validate a comma-separated list of YYYY-MM-DD dates; raises ValueError."""
+    return [date.fromisoformat(part.strip()) for part in raw.split(',') if part.strip()]
+
+
+def bucket_start(day, period, term_starts=()):
+    """
+    First day of the bucket containing `day`: the day itself, its Monday, or
+    the latest term start on or before it. Without a configured term covering
+    the day, terms fall back to calendar quarters.
+    """
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    started = [start for start in term_starts if start <= day]
+    if started:
+        return started[-1]
+    return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+
+
+def build_trends(period, start, end, class_name=None, behavior_id=None):
+    """
+    Return the series for [start, end] as a list of buckets, including empty ones.
+
+    `class_name` restricts every series to that class. `behavior_id` restricts
+    the awards series only; deposits, interest and circulation are per class.
+    Circulation is the cumulative net DB$ at the end of each bucket.
+    """
+    rollup = DailyActivityRollup
+    filters = [rollup.date <= end]
+    if class_name:
+        filters.append(rollup.class_name == class_name)
+
+    is_award = rollup.type == TransactionType.AWARD
+    if behavior_id is not None:
+        is_award = is_award & (rollup.category_id == behavior_id)
+
+    def total_of(condition):
+        return func.coalesce(func.sum(case((condition, rollup.amount_total), else_=0)), 0)
+
+    # Net DB$ before the range opens the circulation series
+    circulation = db.session.query(func.coalesce(func.sum(rollup.amount_total), 0)).filter(
+        rollup.date < start, *filters
+    ).scalar()
+
+    daily = db.session.query(
+        rollup.date,
+        total_of(is_award),
+        total_of(rollup.type == TransactionType.DEPOSIT),
+        total_of(rollup.type == TransactionType.INTEREST),
+        func.sum(rollup.amount_total)
+    ).filter(rollup.date >= start, *filters).group_by(rollup.date).all()
+    by_day = {row[0]: row[1:] for row in daily}
+
+    term_starts = term_start_dates() if period == 'term' else ()
+    series = []
+    day = start
+    while day <= end:
+        key = max(bucket_start(day, period, term_starts), start)
+        if not series or series[-1]['start'] != key.isoformat():
+            series.append({
+                'start': key.isoformat(),
+                'end': key.isoformat(),
+                'awards': 0,
+                'deposits': 0,
+                'interest': 0,
+                'circulation': circulation
+            })
+        bucket = series[-1]
+        awards, deposits, interest, net = by_day.get(day, (0, 0, 0, 0))
+        circulation += net
+        bucket['end'] = day.isoformat()
+        bucket['awards'] += awards
+        bucket['deposits'] += deposits
+        bucket['interest'] += interest
+        bucket['circulation'] = circulation
+        day += timedelta(days=1)
+    return series
@@ -0,0 +1,87 @@
+"""
+Signed Sessions
+
+The Flask session cookie is signed with SECRET_KEY, so the claims written at
+login (user id, role, active flag, session version) can be trusted without a
+database round-trip. Claims are revalidated against the users table every
+AUTH_REVALIDATE_SECONDS, and immediately when this process has committed a
+bump to the user's session_version (PIN change, role change, deactivation).
+Other workers pick up a revocation at their next revalidation.
+"""
+import threading
+import time
+
+from flask import session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from api.models import User
+
+
+# user_id -> lowest session_version still valid, for revocations seen in this process
+_revoked_before = {}
+_revoked_lock = threading.Lock()
+
+_PENDING_REVOCATIONS = 'pending_revocations'
+
+
+def issue_session(user):
+    """Write (or refresh) the signed session claims for an active user."""
+    session['user_id'] = user.id
+    session['user_role'] = user.role.value
+    session['user_active'] = bool(user.is_active)
+    session['session_version'] = user.session_version
+    session['validated_at'] = int(time.time())
+
+
+def session_claims(max_age):
+    """
+    Return (user_id, role value) from the signed session if the claims can be
+    trusted without a DB lookup, else None (caller must revalidate).
+    """
+    user_id = session.get('user_id')
+    version = session.get('session_version')
+    if not user_id or version is None or not session.get('user_active'):
+        return None
+    if time.time() - session.get('validated_at', 0) >= max_age:
+        return None
+    if is_revoked(user_id, version):
+        return None
+    return user_id, session.get('user_role')
+
+
+def is_revoked(user_id, session_version):
+    """True if this process has seen `user_id`'s sessions older than `session_version` revoked."""
+    return session_version < _revoked_before.get(user_id, 0)
+
+
+def note_revocation(user_id, session_version):
+    """Reject claims older than `session_version` for this user in this process."""
+    with _revoked_lock:
+        if session_version > _revoked_before.get(user_id, 0):
+            _revoked_before[user_id] = session_version
+
+
+def clear_revocations():
+    """Forget recorded revocations (tests recreate users with reused ids)."""
+    with _revoked_lock:
+        _revoked_before.clear()
+
+
+@event.listens_for(User, 'after_update')
+def _queue_revocation(mapper, connection, target):
+    if inspect(target).attrs.session_version.history.has_changes():
+        object_session(target).info.setdefault(_PENDING_REVOCATIONS, []).append(
+            (target.id, target.session_version)
+        )
+
+
+@event.listens_for(Session, 'after_commit')
+def _record_revocations(session):
+    for user_id, session_version in session.info.pop(_PENDING_REVOCATIONS, ()):
+        note_revocation(user_id, session_version)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_revocations(session):
+    session.info.pop(_PENDING_REVOCATIONS, None)
@@ -0,0 +1,80 @@
+"""
+Commit Signals
+
+Blinker signals sent after a DB transaction that wrote ledger rows or changed
+users has committed. Caches and live feeds subscribe to these instead of being
+called from every route that writes.
+
+- ledger_committed(session, rows=[...]): rows are dicts with id, user_id, amount,
+  type, category_id, created_by_id and created_at (id is None for bulk inserts).
+- roster_committed(session): a User was created, updated or deleted.
+"""
+from blinker import Namespace
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+_signals = Namespace()
+
+ledger_committed = _signals.signal('ledger-committed')
+roster_committed = _signals.signal('roster-committed')
+
+_PENDING_ROWS = 'pending_ledger_rows'
+_ROSTER_CHANGED = 'roster_changed'
+
+
+def ledger_row(transaction):
+    """Signal payload for an ORM Transaction."""
+    return {
+        'id': transaction.id,
+        'user_id': transaction.user_id,
+        'amount': transaction.amount,
+        'type': transaction.type.value,
+        'category_id': transaction.category_id,
+        'created_by_id': transaction.created_by_id,
+        'created_at': transaction.created_at
+    }
+
+
+def record_ledger_rows(session, rows):
+    """Queue bulk-inserted rows (Transaction column dicts) for ledger_committed."""
+    session.info.setdefault(_PENDING_ROWS, []).extend(
+        {
+            'id': row.get('id'),
+            'user_id': row['user_id'],
+            'amount': row['amount'],
+            'type': row['type'].value,
+            'category_id': row.get('category_id'),
+            'created_by_id': row.get('created_by_id'),
+            'created_at': row.get('created_at')
+        }
+        for row in rows
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    from api.models import Transaction, User
+
+    rows = [ledger_row(obj) for obj in session.new if isinstance(obj, Transaction)]
+    if rows:
+        session.info.setdefault(_PENDING_ROWS, []).extend(rows)
+
+    if any(isinstance(obj, User) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_ROSTER_CHANGED] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _send_signals(session):
+    rows = session.info.pop(_PENDING_ROWS, None)
+    roster_changed = session.info.pop(_ROSTER_CHANGED, False)
+    if rows:
+        ledger_committed.send(session, rows=rows)
+    if roster_changed:
+        roster_committed.send(session)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING_ROWS, None)
+    session.info.pop(_ROSTER_CHANGED, None)
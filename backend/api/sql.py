@@ -0,0 +1,26 @@
+"""
+SQL Dialect Helpers
+
+Upsert-capable INSERT constructs for the databases we deploy on
+(SQLite for small schools, PostgreSQL for larger installs).
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+_UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_insert(bind, table):
+    """
+    Return an INSERT for ``table`` that supports ``on_conflict_do_update`` /
+    ``on_conflict_do_nothing`` on the dialect of ``bind`` (engine, connection or session).
+    """
+    if hasattr(bind, 'get_bind'):
+        bind = bind.get_bind()
+    dialect_name = bind.dialect.name
+    if dialect_name not in _UPSERT_INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on '{dialect_name}'")
+    return _UPSERT_INSERTS[dialect_name](table)
@@ -5,8 +5,11 @@ import os
 from flask import Flask
 from flask_cors import CORS
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from api import db
+from api.cli import register_commands
+from api.engine import configure_engines
 from api.routes import register_routes
 from api.scheduler import init_scheduler
 
@@ -23,14 +26,69 @@ def create_app(config_name=None):
     )
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # SQLite connection PRAGMAs: "tuned" (WAL, busy timeout, mmap, cache) or "off"
+    app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'tuned')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = os.environ.get('SQLITE_BUSY_TIMEOUT_MS')
+    app.config['SQLITE_MMAP_SIZE_MB'] = os.environ.get('SQLITE_MMAP_SIZE_MB')
+    app.config['SQLITE_CACHE_SIZE_MB'] = os.environ.get('SQLITE_CACHE_SIZE_MB')
+    
+    # Werkzeug hash methods per role (e.g. "pbkdf2:sha256:50000", "scrypt:16384:8:1").
+    # A 4-digit PIN has 10,000 values, so an expensive hash buys little, while a whole
+    # class logging in at once each morning pays for it. Stored hashes are upgraded on login.
+    staff_hash_method = os.environ.get('STAFF_PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_METHODS'] = {
+        'student': os.environ.get('STUDENT_PIN_HASH_METHOD', 'pbkdf2:sha256:50000'),
+        'teacher': staff_hash_method,
+        'admin': staff_hash_method,
+    }
+    
+    # Login throttling (per worker): a classroom often shares one IP, so that limit is higher
+    app.config['LOGIN_ATTEMPT_WINDOW_SECONDS'] = int(os.environ.get('LOGIN_ATTEMPT_WINDOW_SECONDS', '60'))
+    app.config['LOGIN_MAX_ATTEMPTS_PER_USERNAME'] = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_USERNAME', '10'))
+    app.config['LOGIN_MAX_ATTEMPTS_PER_IP'] = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', '120'))
+    
+    # Reverse proxies in front of the app (nginx: 1). Their X-Forwarded-For/-Proto set the
+    # client address used by the per-IP limit; 0 when the app is reached directly.
+    app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', '1'))
+    
+    # Seconds signed session claims are trusted before rechecking the user row
+    app.config['AUTH_REVALIDATE_SECONDS'] = int(os.environ.get('AUTH_REVALIDATE_SECONDS', '300'))
+    
+    # Live event stream (/api/events): keepalive interval, open streams allowed per process,
+    # and seconds between reads of commits made by other workers
+    app.config['SSE_HEARTBEAT_SECONDS'] = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+    app.config['SSE_MAX_SUBSCRIBERS'] = int(os.environ.get('SSE_MAX_SUBSCRIBERS', '200'))
+    app.config['SSE_POLL_SECONDS'] = float(os.environ.get('SSE_POLL_SECONDS', '1'))
+    
+    # Seconds between version-stamp checks of the cached system_config table
+    app.config['CONFIG_CACHE_CHECK_SECONDS'] = float(os.environ.get('CONFIG_CACHE_CHECK_SECONDS', '5'))
+    
+    # Seconds a cached leaderboard may be served; bounds staleness from other workers' writes
+    app.config['LEADERBOARD_CACHE_TTL'] = float(os.environ.get('LEADERBOARD_CACHE_TTL', '15'))
+    
+    # Seconds the ranked student count (totalStudents on /api/balance/me) may be served
+    app.config['RANK_TOTAL_CACHE_TTL'] = float(os.environ.get('RANK_TOTAL_CACHE_TTL', '15'))
+    
+    # Scheduler leader lock: only the process holding this file lock runs jobs
+    app.config['SCHEDULER_LOCK_FILE'] = os.environ.get(
+        'SCHEDULER_LOCK_FILE',
+        os.path.join(app.instance_path, 'scheduler.lock')
+    )
+    app.config['SCHEDULER_ELECTION_INTERVAL'] = int(os.environ.get('SCHEDULER_ELECTION_INTERVAL', '60'))
+    
     # Ensure instance folder exists
     try:
         os.makedirs(app.instance_path)
     except OSError:
         pass
     
+    if app.config['TRUSTED_PROXY_COUNT'] > 0:
+        hops = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    
     # Initialize extensions
     db.init_app(app)
+    configure_engines(app, db)
     Migrate(app, db)
     # Get CORS origins from environment or use development defaults
     cors_origins = [
@@ -44,6 +102,9 @@ def create_app(config_name=None):
     # Register routes
     register_routes(app)
     
+    # Register maintenance CLI commands
+    register_commands(app)
+    
     # Initialize scheduler for interest calculations
     if os.environ.get('FLASK_ENV') != 'testing':
         init_scheduler(app)
@@ -0,0 +1,122 @@
+"""
+Award Throughput Benchmark
+
+Measures POST /api/transactions/award throughput with several concurrent writer
+processes (one per "classroom") while reader processes poll the roster, once per
+SQLite profile, each against a fresh database file.
+
+Usage (from backend/):
+    python benchmarks/award_throughput.py --writers 4 --readers 2 --awards 200
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_app(db_path, profile):
+    os.environ['FLASK_ENV'] = 'testing'
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['SQLITE_PROFILE'] = profile
+    from app import create_app
+    return create_app()
+
+
+def _seed(db_path, profile, students):
+    from api import db
+    from api.models import User, UserRole
+
+    app = _make_app(db_path, profile)
+    with app.app_context():
+        db.create_all()
+        teacher = User(username='bench', first_name='Bench', last_name='Teacher', role=UserRole.TEACHER)
+        teacher.set_pin('bench')
+        db.session.add(teacher)
+        for i in range(students):
+            db.session.add(User(
+                username=f'bench{i}', first_name='Bench', last_name=str(i),
+                role=UserRole.STUDENT, class_name='5A', pin_hash='unused'
+            ))
+        db.session.commit()
+        return [u.id for u in User.query.filter_by(role=UserRole.STUDENT)]
+
+
+def _writer(db_path, profile, student_ids, awards, start, results):
+    app = _make_app(db_path, profile)
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'bench', 'pin': 'bench'})
+    start.wait()
+    ok = failed = 0
+    for i in range(awards):
+        r = client.post('/api/transactions/award', json={'studentId': student_ids[i % len(student_ids)]})
+        if r.status_code == 201:
+            ok += 1
+        else:
+            failed += 1
+    results.put((ok, failed))
+
+
+def _reader(db_path, profile, start, stop):
+    app = _make_app(db_path, profile)
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'bench', 'pin': 'bench'})
+    start.wait()
+    while not stop.is_set():
+        client.get('/api/students?include_balance=true')
+
+
+def run(profile, writers, readers, awards, students):
+    """Run one benchmark round and return (awards_ok, awards_failed, seconds)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        student_ids = _seed(db_path, profile, students)
+
+        start = multiprocessing.Event()
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        writer_procs = [
+            multiprocessing.Process(target=_writer, args=(db_path, profile, student_ids, awards, start, results))
+            for _ in range(writers)
+        ]
+        reader_procs = [
+            multiprocessing.Process(target=_reader, args=(db_path, profile, start, stop))
+            for _ in range(readers)
+        ]
+        for p in writer_procs + reader_procs:
+            p.start()
+        time.sleep(2)  # let every process import the app and log in
+
+        began = time.perf_counter()
+        start.set()
+        totals = [results.get() for _ in writer_procs]
+        elapsed = time.perf_counter() - began
+
+        stop.set()
+        for p in writer_procs + reader_procs:
+            p.join()
+
+    return sum(t[0] for t in totals), sum(t[1] for t in totals), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4, help='concurrent award processes')
+    parser.add_argument('--readers', type=int, default=2, help='concurrent roster-polling processes')
+    parser.add_argument('--awards', type=int, default=200, help='awards per writer')
+    parser.add_argument('--students', type=int, default=100, help='students in the roster')
+    parser.add_argument('--profiles', default='off,tuned', help='comma-separated SQLITE_PROFILE values')
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.awards} awards, {args.readers} readers, {args.students} students")
+    print(f"{'profile':<8} {'ok':>6} {'failed':>7} {'seconds':>8} {'awards/s':>9}")
+    for profile in args.profiles.split(','):
+        ok, failed, elapsed = run(profile, args.writers, args.readers, args.awards, args.students)
+        print(f"{profile:<8} {ok:>6} {failed:>7} {elapsed:>8.2f} {ok / elapsed:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Login Throughput Benchmark
+
+Measures POST /api/auth/login throughput for student PIN logins (the morning
+login storm) with several concurrent worker processes, once per student hash
+method, each against a fresh database file. Use the logins/s per worker to
+size the number of workers for a class (or school) logging in at once.
+
+Usage (from backend/):
+    python benchmarks/login_throughput.py --workers 2 --logins 100
+    python benchmarks/login_throughput.py --methods scrypt,pbkdf2:sha256:50000,pbkdf2:sha256:10000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_app(db_path, method):
+    os.environ['FLASK_ENV'] = 'testing'
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['STUDENT_PIN_HASH_METHOD'] = method
+    # Every simulated login comes from one address; measure hashing, not throttling
+    os.environ['LOGIN_MAX_ATTEMPTS_PER_IP'] = '1000000'
+    os.environ['LOGIN_MAX_ATTEMPTS_PER_USERNAME'] = '1000000'
+    from app import create_app
+    return create_app()
+
+
+def _seed(db_path, method, students):
+    from api import db
+    from api.models import User, UserRole
+
+    app = _make_app(db_path, method)
+    with app.app_context():
+        db.create_all()
+        for i in range(students):
+            student = User(
+                username=f'bench{i}', first_name='Bench', last_name=str(i),
+                role=UserRole.STUDENT, class_name='5A'
+            )
+            student.set_pin('1234')
+            db.session.add(student)
+        db.session.commit()
+
+
+def _worker(db_path, method, offset, logins, students, start, results):
+    app = _make_app(db_path, method)
+    client = app.test_client()
+    start.wait()
+    ok = failed = 0
+    began = time.perf_counter()
+    for i in range(logins):
+        r = client.post('/api/auth/login', json={'username': f'bench{(offset + i) % students}', 'pin': '1234'})
+        if r.status_code == 200:
+            ok += 1
+        else:
+            failed += 1
+    results.put((ok, failed, time.perf_counter() - began))
+
+
+def run(method, workers, logins, students):
+    """Run one benchmark round and return (logins_ok, logins_failed, seconds, mean per-worker logins/s)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _seed(db_path, method, students)
+
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(
+                target=_worker, args=(db_path, method, n * logins, logins, students, start, results)
+            )
+            for n in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        time.sleep(2)  # let every process import the app
+
+        began = time.perf_counter()
+        start.set()
+        totals = [results.get() for _ in procs]
+        elapsed = time.perf_counter() - began
+
+        for p in procs:
+            p.join()
+
+    per_worker = sum(t[0] / t[2] for t in totals) / len(totals)
+    return sum(t[0] for t in totals), sum(t[1] for t in totals), elapsed, per_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help='concurrent login processes')
+    parser.add_argument('--logins', type=int, default=100, help='logins per worker')
+    parser.add_argument('--students', type=int, default=30, help='students in the roster')
+    parser.add_argument('--methods', default='scrypt,pbkdf2:sha256:50000',
+                        help='comma-separated STUDENT_PIN_HASH_METHOD values')
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.logins} logins, {args.students} students")
+    print(f"{'method':<24} {'ok':>6} {'failed':>7} {'seconds':>8} {'logins/s':>9} {'per worker':>11}")
+    for method in args.methods.split(','):
+        ok, failed, elapsed, per_worker = run(method, args.workers, args.logins, args.students)
+        print(f"{method:<24} {ok:>6} {failed:>7} {elapsed:>8.2f} {ok / elapsed:>9.1f} {per_worker:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
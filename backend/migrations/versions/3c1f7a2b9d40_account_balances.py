@@ -0,0 +1,36 @@
+"""Materialized account balances
+
+Revision ID: 3c1f7a2b9d40
+Revises: 9ae20605a4aa
+Create Date: 2026-10-17 09:12:44.201583
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a2b9d40'
+down_revision = '9ae20605a4aa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account_balances',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from the existing ledger
+    op.execute(
+        "INSERT INTO account_balances (user_id, balance, updated_at) "
+        "SELECT user_id, SUM(amount), CURRENT_TIMESTAMP FROM transactions GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('account_balances')
@@ -0,0 +1,28 @@
+"""Composite indexes for keyset pagination of transactions
+
+Revision ID: 4f8d2e61a9c7
+Revises: e5a9c3f17b62
+Create Date: 2026-10-17 12:41:52.307716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f8d2e61a9c7'
+down_revision = 'e5a9c3f17b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_user_created_id', ['user_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_transactions_type_created_id', ['type', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_type_created_id')
+        batch_op.drop_index('ix_transactions_user_created_id')
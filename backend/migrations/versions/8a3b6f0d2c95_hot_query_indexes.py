@@ -0,0 +1,43 @@
+"""Composite indexes for hot ledger and roster queries
+
+Revision ID: 8a3b6f0d2c95
+Revises: 4f8d2e61a9c7
+Create Date: 2026-10-17 13:30:18.552091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3b6f0d2c95'
+down_revision = '4f8d2e61a9c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_user_type_amount', ['user_id', 'type', 'amount'], unique=False)
+        batch_op.create_index('ix_transactions_category_created', ['category_id', 'created_at'], unique=False)
+        # Both user composites lead with user_id
+        batch_op.drop_index('ix_transactions_user_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_role_active_class', ['role', 'is_active', 'class_name'], unique=False)
+
+    with op.batch_alter_table('daily_snapshots', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_snapshots_date_user_balance', ['date', 'user_id', 'balance_at_snapshot'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('daily_snapshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_snapshots_date_user_balance')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_active_class')
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_transactions_category_created')
+        batch_op.drop_index('ix_transactions_user_type_amount')
@@ -0,0 +1,37 @@
+"""Weekly interest runs
+
+Revision ID: b7e24d0c5a18
+Revises: 3c1f7a2b9d40
+Create Date: 2026-10-17 10:03:27.918422
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e24d0c5a18'
+down_revision = '3c1f7a2b9d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('interest_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('week', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'COMPLETED', 'FAILED', name='interestrunstatus'), nullable=False),
+    sa.Column('interest_rate', sa.Float(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('student_count', sa.Integer(), nullable=False),
+    sa.Column('total_paid', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('week')
+    )
+
+
+def downgrade():
+    op.drop_table('interest_runs')
@@ -0,0 +1,26 @@
+"""Session version counter on users for revoking signed sessions
+
+Revision ID: c2d9e4a7f318
+Revises: 8a3b6f0d2c95
+Create Date: 2026-10-17 15:02:41.118734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d9e4a7f318'
+down_revision = '8a3b6f0d2c95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('session_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('session_version')
@@ -0,0 +1,47 @@
+"""Daily activity rollups for analytics
+
+Revision ID: d41f7b2e8c63
+Revises: c2d9e4a7f318
+Create Date: 2026-10-17 16:10:27.402615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f7b2e8c63'
+down_revision = 'c2d9e4a7f318'
+branch_labels = None
+depends_on = None
+
+TRANSACTION_TYPES = ('DEPOSIT', 'AWARD', 'SPEND', 'INTEREST', 'RAFFLE')
+
+
+def upgrade():
+    op.create_table('daily_activity_rollups',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('class_name', sa.String(length=50), nullable=False),
+    # Reuses the transactions.type enum (already created on PostgreSQL)
+    sa.Column('type', sa.Enum(*TRANSACTION_TYPES, name='transactiontype').with_variant(
+        postgresql.ENUM(*TRANSACTION_TYPES, name='transactiontype', create_type=False), 'postgresql'
+    ), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('tx_count', sa.Integer(), nullable=False),
+    sa.Column('amount_total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('date', 'class_name', 'type', 'category_id')
+    )
+
+    # Backfill from the existing ledger ('' / 0 stand in for no class / no behavior)
+    op.execute(
+        "INSERT INTO daily_activity_rollups (date, class_name, type, category_id, tx_count, amount_total) "
+        "SELECT date(t.created_at), COALESCE(u.class_name, ''), t.type, COALESCE(t.category_id, 0), "
+        "COUNT(t.id), SUM(t.amount) "
+        "FROM transactions t JOIN users u ON u.id = t.user_id "
+        "GROUP BY date(t.created_at), COALESCE(u.class_name, ''), t.type, COALESCE(t.category_id, 0)"
+    )
+
+
+def downgrade():
+    op.drop_table('daily_activity_rollups')
@@ -0,0 +1,26 @@
+"""Index account balances for rank lookups
+
+Revision ID: e5a9c3f17b62
+Revises: b7e24d0c5a18
+Create Date: 2026-10-17 11:20:05.634118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3f17b62'
+down_revision = 'b7e24d0c5a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('account_balances', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_account_balances_balance'), ['balance'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('account_balances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_account_balances_balance'))
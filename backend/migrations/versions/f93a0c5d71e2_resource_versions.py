@@ -0,0 +1,29 @@
+"""Resource version counters for HTTP ETags
+
+Revision ID: f93a0c5d71e2
+Revises: d41f7b2e8c63
+Create Date: 2026-10-18 09:12:55.630418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f93a0c5d71e2'
+down_revision = 'd41f7b2e8c63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resource_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('resource_versions')
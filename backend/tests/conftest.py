@@ -3,6 +3,8 @@ Pytest configuration and fixtures for Dibby Dollars backend tests.
 Uses in-memory SQLite per test and provides app, client, and seeded data.
 """
 import os
+from contextlib import contextmanager
+
 import pytest
 
 # Ensure testing mode before app is imported
@@ -13,14 +15,28 @@ os.environ['FLASK_ENV'] = 'testing'
 def app():
     """Create application for testing with in-memory database (fresh per test)."""
     from app import create_app
+    # Flask-SQLAlchemy builds engines in init_app, so the URI must be set before create_app
+    os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
     app = create_app()
     app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['SECRET_KEY'] = 'test-secret-key'
     app.config['WTF_CSRF_ENABLED'] = False
     return app
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """In-process caches and limiters are module-level; start every test empty."""
+    from api.cache import caches
+    from api.ratelimit import limiters
+    from api.sessions import clear_revocations
+    for cache in caches.values():
+        cache.clear()
+    for limiter in limiters.values():
+        limiter.clear()
+    clear_revocations()
+
+
 @pytest.fixture
 def client(app):
     """Test client for making requests."""
@@ -38,6 +54,71 @@ def db(app):
         db.drop_all()
 
 
+@pytest.fixture
+def count_queries(db):
+    """
+    Context manager factory that records SQL statements sent to the engine.
+    Usage: `with count_queries() as statements: ...; assert len(statements) == n`.
+    """
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
+
+@pytest.fixture
+def login():
+    """
+    Log a test client in, as the seeded teacher unless a username and PIN are given.
+    Usage: `login(client)` or `login(client, 'student1', '1234')`; returns the client.
+    """
+    def log_in(client, username='teacher', pin='teacher123'):
+        client.post('/api/auth/login', json={'username': username, 'pin': pin})
+        return client
+
+    return log_in
+
+
+@pytest.fixture
+def teacher_client(client, seeded, login):
+    """Test client logged in as the seeded teacher."""
+    return login(client)
+
+
+@pytest.fixture
+def add_student(db):
+    """
+    Factory adding a student in class 5A with the given (amount, created_at) deposits.
+    Usage: `add_student('rich', deposits=[(50, now)])`; returns the new user id.
+    """
+    from api.models import User, UserRole, Transaction, TransactionType
+
+    def add(username, class_name='5A', deposits=(), is_active=True):
+        student = User(username=username, first_name='Student', last_name=username,
+                       role=UserRole.STUDENT, class_name=class_name, is_active=is_active, pin_hash='x')
+        db.session.add(student)
+        db.session.flush()
+        for amount, created_at in deposits:
+            db.session.add(Transaction(user_id=student.id, amount=amount,
+                                       type=TransactionType.DEPOSIT, created_at=created_at))
+        db.session.commit()
+        return student.id
+
+    return add
+
+
 @pytest.fixture
 def seeded(app, db):
     """
@@ -0,0 +1,49 @@
+"""
+Integration tests for admin endpoints.
+
+Verifies:
+- Interest can be previewed without paying
+- Real runs are only triggered manually on the interest day
+- Interest run history is exposed to admins
+- Config updates are validated as a whole and applied together
+"""
+from datetime import date, timedelta
+
+
+def test_trigger_interest_dry_run_then_history(client, seeded):
+    """Dry run leaves history empty; a real run shows up in /interest-runs."""
+    client.post('/api/auth/login', json={'username': 'admin', 'pin': 'admin123'})
+    client.post('/api/transactions/deposit', json={'studentId': seeded['student_id'], 'amount': 100})
+
+    r = client.post('/api/admin/trigger-interest', json={'dryRun': True})
+    assert r.status_code == 200
+    assert r.get_json()['result']['plan'][0]['userId'] == seeded['student_id']
+    assert client.get('/api/admin/interest-runs').get_json()['runs'] == []
+
+    # A real run on another day would use up the week before the scheduled run
+    tomorrow = (date.today() + timedelta(days=1)).strftime('%A').lower()
+    client.put('/api/admin/config', json={'interestDay': tomorrow})
+    assert client.post('/api/admin/trigger-interest').status_code == 409
+
+    client.put('/api/admin/config', json={'interestDay': date.today().strftime('%A').lower()})
+    r = client.post('/api/admin/trigger-interest')
+    assert r.get_json()['result']['totalInterestDistributed'] == 2
+
+    runs = client.get('/api/admin/interest-runs').get_json()['runs']
+    assert len(runs) == 1
+    assert runs[0]['status'] == 'completed'
+    assert runs[0]['totalPaid'] == 2
+
+
+def test_update_config_is_all_or_nothing(client, seeded):
+    """One invalid value rejects the request without applying the valid ones."""
+    client.post('/api/auth/login', json={'username': 'admin', 'pin': 'admin123'})
+    r = client.put('/api/admin/config', json={'interestRate': '3.5', 'rafflePrizeDefault': '-1'})
+    assert r.status_code == 400
+    assert client.get('/api/admin/config').get_json()['config']['interest_rate']['value'] == '2.0'
+
+    r = client.put('/api/admin/config', json={'interestRate': '3.5', 'rafflePrizeDefault': '75'})
+    assert sorted(r.get_json()['updated']) == ['interest_rate', 'raffle_prize_default']
+    config = client.get('/api/admin/config').get_json()['config']
+    assert config['interest_rate']['value'] == '3.5'
+    assert config['raffle_prize_default']['value'] == '75'
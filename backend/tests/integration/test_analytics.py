@@ -0,0 +1,181 @@
+"""
+Integration tests for analytics endpoints.
+
+Verifies:
+- Savers and earners leaderboards rank students correctly
+- Class filter is applied
+- Leaderboard cost does not grow with roster size
+- System stats and behavior breakdown are served from rollups, not the ledger
+- Trends bucket rollups by day/week/term with cumulative circulation and filters
+"""
+from datetime import datetime, timedelta
+
+from api import db
+from api.models import Transaction, TransactionType
+
+
+def test_savers_leaderboard_ranks_by_balance(app, client, seeded, login, add_student):
+    """Savers are ordered by balance, with names from the same query."""
+    now = datetime.utcnow()
+    with app.app_context():
+        rich = add_student('rich', '5A', [(50, now)])
+        mid = add_student('mid', '5A', [(20, now), (-5, now)])
+        add_student('other', '6B', [(90, now)])
+    login(client)
+
+    r = client.get('/api/analytics/leaderboard?type=savers&class_name=5A')
+    board = r.get_json()['leaderboard']
+    assert [(e['userId'], e['value'], e['rank']) for e in board] == [(rich, 50, 1), (mid, 15, 2)]
+    assert board[0]['name'] == 'Student rich'
+    assert board[0]['className'] == '5A'
+
+
+def test_earners_leaderboard_counts_only_this_week(app, client, seeded, login, add_student):
+    """Earners sum positive transactions from the last 7 days."""
+    now = datetime.utcnow()
+    with app.app_context():
+        old = add_student('old', '5A', [(100, now - timedelta(days=30)), (1, now)])
+        new = add_student('new', '5A', [(5, now), (-3, now)])
+    login(client)
+
+    board = client.get('/api/analytics/leaderboard?type=earners').get_json()['leaderboard']
+    assert [(e['userId'], e['value']) for e in board] == [(new, 5), (old, 1)]
+
+
+def test_leaderboard_query_count_is_constant(app, client, seeded, count_queries, login, add_student):
+    """Ranking 3 or 30 students issues the same number of statements."""
+    now = datetime.utcnow()
+    login(client)
+    with app.app_context():
+        for i in range(3):
+            add_student(f'few{i}', '5A', [(i + 1, now)])
+    with count_queries() as small:
+        client.get('/api/analytics/leaderboard?type=savers')
+    with app.app_context():
+        for i in range(27):
+            add_student(f'many{i}', '5A', [(i + 1, now)])
+    with count_queries() as large:
+        r = client.get('/api/analytics/leaderboard?type=savers&limit=50')
+    assert len(r.get_json()['leaderboard']) == 30
+    assert len(large) == len(small)
+
+
+def test_leaderboard_is_cached_until_ledger_write(app, client, seeded, count_queries, login):
+    """Repeat polls hit the cache; an award invalidates it."""
+    from api.routes.analytics import leaderboard_cache
+    login(client)
+    client.post('/api/transactions/deposit', json={'studentId': seeded['student_id'], 'amount': 3})
+
+    first = client.get('/api/analytics/leaderboard').get_json()['leaderboard']
+    hits = leaderboard_cache.stats()['hits']
+    with count_queries() as statements:
+        again = client.get('/api/analytics/leaderboard').get_json()['leaderboard']
+    assert again == first
+    # Only the ETag validators (version rows, newest ledger id) run; no ranking query
+    assert not any('account_balances' in s or 'sum(' in s.lower() for s in statements)
+    assert leaderboard_cache.stats()['hits'] == hits + 1
+
+    client.post('/api/transactions/award', json={'studentId': seeded['student_ids'][1]})
+    board = client.get('/api/analytics/leaderboard').get_json()['leaderboard']
+    assert [e['userId'] for e in board] == [seeded['student_id'], seeded['student_ids'][1]]
+
+
+def test_admin_metrics_expose_cache_counters(client, seeded):
+    """Admins can read hit/miss counters."""
+    client.post('/api/auth/login', json={'username': 'admin', 'pin': 'admin123'})
+    before = client.get('/api/admin/metrics').get_json()['caches']['leaderboard']
+    client.get('/api/analytics/leaderboard')
+    client.get('/api/analytics/leaderboard')
+    stats = client.get('/api/admin/metrics').get_json()['caches']['leaderboard']
+    assert stats['hits'] == before['hits'] + 1
+    assert stats['misses'] == before['misses'] + 1
+
+
+def test_stats_and_breakdown_read_rollups(app, client, seeded, count_queries, login):
+    """Totals match the ledger without any statement reading transactions."""
+    now = datetime.utcnow()
+    with app.app_context():
+        sid = seeded['student_id']
+        for category_id in (1, 1, 2, None):
+            db.session.add(Transaction(user_id=sid, amount=1, type=TransactionType.AWARD,
+                                       category_id=category_id, created_at=now))
+        db.session.add(Transaction(user_id=sid, amount=3, type=TransactionType.INTEREST, created_at=now))
+        db.session.add(Transaction(user_id=sid, amount=50, type=TransactionType.DEPOSIT,
+                                   created_at=now - timedelta(days=60)))
+        db.session.commit()
+    login(client)
+
+    with count_queries() as statements:
+        stats = client.get('/api/analytics/system-stats').get_json()['stats']
+        breakdown = client.get('/api/analytics/behavior-breakdown?days=30').get_json()['breakdown']
+    assert not [s for s in statements if 'transactions' in s]
+
+    assert stats['totalCirculation'] == 57
+    assert stats['transactionsToday'] == 5
+    assert stats['totalInterestDistributed'] == 3
+    assert breakdown == [
+        {'behavior': 'Helping Others', 'count': 2},
+        {'behavior': 'On Task', 'count': 1},
+        {'behavior': 'Other', 'count': 1},
+    ]
+
+
+def _add_activity(student_id, rows):
+    for day, amount, tx_type, category_id in rows:
+        db.session.add(Transaction(user_id=student_id, amount=amount, type=tx_type,
+                                   category_id=category_id, created_at=datetime(*day, 10)))
+    db.session.commit()
+
+
+def test_trends_by_day_and_week(app, client, seeded, login, add_student):
+    """Daily buckets include empty days; weeks start Monday; circulation is cumulative."""
+    with app.app_context():
+        _add_activity(seeded['student_id'], [
+            ((2026, 9, 30), 40, TransactionType.DEPOSIT, None),    # Before the range
+            ((2026, 10, 5), 1, TransactionType.AWARD, 1),
+            ((2026, 10, 5), 1, TransactionType.AWARD, 2),
+            ((2026, 10, 7), 10, TransactionType.DEPOSIT, None),
+            ((2026, 10, 12), 2, TransactionType.INTEREST, None),
+        ])
+        other = add_student('trend6b', '6B', [])
+        _add_activity(other, [((2026, 10, 6), 100, TransactionType.DEPOSIT, None)])
+    login(client)
+
+    r = client.get('/api/analytics/trends?period=day&start=2026-10-05&end=2026-10-07&class_name=5A')
+    assert r.status_code == 200
+    series = r.get_json()['series']
+    assert [(b['start'], b['awards'], b['deposits'], b['circulation']) for b in series] == [
+        ('2026-10-05', 2, 0, 42),
+        ('2026-10-06', 0, 0, 42),
+        ('2026-10-07', 0, 10, 52),
+    ]
+
+    series = client.get('/api/analytics/trends?period=week&start=2026-10-01&end=2026-10-13').get_json()['series']
+    assert [(b['start'], b['end'], b['deposits'], b['interest'], b['circulation']) for b in series] == [
+        ('2026-10-01', '2026-10-04', 0, 0, 40),
+        ('2026-10-05', '2026-10-11', 110, 0, 152),
+        ('2026-10-12', '2026-10-13', 0, 2, 154),
+    ]
+
+    series = client.get('/api/analytics/trends?period=week&start=2026-10-05&end=2026-10-11&behavior_id=2').get_json()['series']
+    assert series[0]['awards'] == 1 and series[0]['deposits'] == 110
+
+
+def test_trends_by_configured_term(app, client, seeded):
+    """Terms follow the admin-configured start dates."""
+    with app.app_context():
+        _add_activity(seeded['student_id'], [
+            ((2026, 9, 10), 5, TransactionType.DEPOSIT, None),
+            ((2027, 1, 10), 7, TransactionType.DEPOSIT, None),
+        ])
+    client.post('/api/auth/login', json={'username': 'admin', 'pin': 'admin123'})
+    assert client.put('/api/admin/config', json={'termStartDates': 'soon'}).status_code == 400
+    assert client.put('/api/admin/config', json={'termStartDates': '2026-09-02,2027-01-06'}).status_code == 200
+
+    series = client.get('/api/analytics/trends?period=term&start=2026-09-02&end=2027-03-31').get_json()['series']
+    assert [(b['start'], b['deposits'], b['circulation']) for b in series] == [
+        ('2026-09-02', 5, 5),
+        ('2027-01-06', 7, 12),
+    ]
+    assert client.get('/api/analytics/trends?period=month').status_code == 400
+    assert client.get('/api/analytics/trends?start=2026-10-10&end=2026-10-01').status_code == 400
@@ -6,6 +6,9 @@ Verifies:
 - Wrong PIN -> 401
 - Protected routes return 401 when not authenticated
 - Role enforcement: student cannot access teacher/admin endpoints
+- Signed session claims skip the user lookup; PIN change and deactivation revoke them
+- A rolled-back session_version bump revokes nothing
+- Login attempts over the per-username limit get 429 without a PIN check
 """
 import pytest
 
@@ -88,3 +91,139 @@ def test_teacher_can_award_and_balance_increases(client, seeded):
     assert data.get('newBalance') == 1
     assert data['transaction']['amount'] == 1
     assert data['transaction']['type'] == 'award'
+
+
+def test_protected_request_loads_user_once(app, client, seeded, count_queries):
+    """Stale claims are revalidated once; the handler then trusts the re-issued claims."""
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    with client.session_transaction() as sess:
+        sess['validated_at'] -= app.config['AUTH_REVALIDATE_SECONDS']
+    with count_queries() as statements:
+        r = client.get('/api/balance/me')
+    assert r.status_code == 200
+    user_lookups = [s for s in statements if 'FROM users' in s and s.rstrip().endswith('WHERE users.id = ?')]
+    assert len(user_lookups) == 1
+
+
+def test_deactivated_user_rejected_on_next_request(app, client, seeded):
+    """A user loaded in one request is not reused by later requests."""
+    from api import db
+    from api.models import User
+    client.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+    assert client.get('/api/transactions').status_code == 200
+    teacher = User.query.filter_by(username='teacher').first()
+    teacher.is_active = False
+    db.session.commit()
+    assert client.get('/api/transactions').status_code == 401
+
+
+def test_role_check_skips_user_lookup(client, seeded, count_queries):
+    """Fresh signed claims authorize routes and identify the caller without reading users."""
+    def caller_lookups(statements):
+        return [s for s in statements if 'FROM users' in s and s.rstrip().endswith('WHERE users.id = ?')]
+
+    client.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+    with count_queries() as statements:
+        r = client.get('/api/behaviors')
+    assert r.status_code == 200
+    assert not [s for s in statements if 'FROM users' in s]
+
+    with count_queries() as statements:
+        r = client.post('/api/transactions/award', json={'studentId': seeded['student_id']})
+    assert r.status_code == 201
+    assert r.get_json()['transaction']['createdById'] == seeded['teacher_id']
+    assert len(caller_lookups(statements)) == 1  # The student's balance after commit, not the teacher
+
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    with count_queries() as statements:
+        r = client.get('/api/balance/me')
+    assert r.status_code == 200
+    assert r.get_json()['balance'] == 1
+    assert not caller_lookups(statements)
+
+
+def test_pin_change_revokes_student_session(app, seeded):
+    """A teacher resetting a PIN logs the student out on their next request."""
+    student = app.test_client()
+    teacher = app.test_client()
+    student.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    teacher.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+    assert student.get('/api/balance/me').status_code == 200
+
+    r = teacher.put(f"/api/students/{seeded['student_id']}", json={'pin': '9999'})
+    assert r.status_code == 200
+    assert student.get('/api/balance/me').status_code == 401
+    assert student.post('/api/auth/login', json={'username': 'student1', 'pin': '9999'}).status_code == 200
+    assert student.get('/api/balance/me').status_code == 200
+
+
+def test_rolled_back_revocation_keeps_session(client, seeded):
+    """A flushed version bump that is rolled back leaves the current claims valid."""
+    from api import db
+    from api.models import User
+    from api.sessions import is_revoked
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+
+    user = db.session.get(User, seeded['student_id'])
+    user.revoke_sessions()
+    db.session.flush()
+    db.session.rollback()
+
+    assert not is_revoked(seeded['student_id'], 1)
+    assert client.get('/api/balance/me').status_code == 200
+
+
+def test_revocation_from_other_worker_applies_after_revalidation(app, client, seeded):
+    """A version bump this process did not see is caught once claims go stale."""
+    from sqlalchemy import text
+    from api import db
+    client.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+    db.session.execute(text("UPDATE users SET session_version = session_version + 1 WHERE username = 'teacher'"))
+    db.session.commit()
+    assert client.get('/api/behaviors').status_code == 200  # Claims still fresh
+
+    app.config['AUTH_REVALIDATE_SECONDS'] = 0
+    assert client.get('/api/behaviors').status_code == 401
+
+
+def test_login_throttled_before_pin_check(app, client, seeded, monkeypatch):
+    """Excess attempts are rejected without hashing; rejections show in admin metrics."""
+    from api.models import User
+    app.config['LOGIN_MAX_ATTEMPTS_PER_USERNAME'] = 3
+    checks = []
+    original = User.check_pin
+    monkeypatch.setattr(User, 'check_pin', lambda self, pin: checks.append(pin) or original(self, pin))
+
+    for _ in range(3):
+        assert client.post('/api/auth/login', json={'username': 'student1', 'pin': '0000'}).status_code == 401
+    r = client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    assert r.status_code == 429
+    assert int(r.headers['Retry-After']) > 0
+    assert len(checks) == 3
+
+    # Other usernames from the same client are unaffected; a success clears its own count
+    assert client.post('/api/auth/login', json={'username': 'student2', 'pin': '1234'}).status_code == 200
+
+    client.post('/api/auth/login', json={'username': 'admin', 'pin': 'admin123'})
+    stats = client.get('/api/admin/metrics').get_json()['rateLimits']
+    assert stats['login_username']['rejected'] == 1
+    assert stats['login_ip']['rejected'] == 0
+
+
+def test_login_ip_limit_uses_forwarded_client(app, client, seeded):
+    """Behind the proxy each client has its own IP bucket, and successful logins do not fill it."""
+    app.config['LOGIN_MAX_ATTEMPTS_PER_IP'] = 2
+
+    def login(pin, forwarded_for):
+        return client.post(
+            '/api/auth/login',
+            json={'username': 'student1', 'pin': pin},
+            headers={'X-Forwarded-For': forwarded_for}
+        ).status_code
+
+    for _ in range(3):
+        assert login('1234', '10.0.0.1') == 200
+    assert login('0000', '10.0.0.1') == 401
+    assert login('0000', '10.0.0.1') == 401
+    assert login('1234', '10.0.0.1') == 429
+    assert login('1234', '10.0.0.2') == 200
@@ -0,0 +1,73 @@
+"""
+Integration tests for balance endpoints.
+
+Verifies:
+- /balance/me returns balance, interest earned and savings rank
+- Rank ignores inactive students and staff
+- Rank lookup cost does not grow with roster size
+"""
+from datetime import datetime
+
+from api import db
+from api.models import Transaction, TransactionType
+
+
+def _deposit(user_id, amount, tx_type=TransactionType.DEPOSIT):
+    db.session.add(Transaction(user_id=user_id, amount=amount, type=tx_type))
+    db.session.commit()
+
+
+def test_my_balance_rank_and_interest(app, client, seeded, add_student):
+    """Student sees their balance, interest total and rank among active students."""
+    now = datetime.utcnow()
+    with app.app_context():
+        _deposit(seeded['student_id'], 30)
+        _deposit(seeded['student_id'], 2, TransactionType.INTEREST)
+        add_student('top', deposits=[(100, now)])
+        add_student('low', deposits=[(5, now)])
+        add_student('gone', deposits=[(500, now)], is_active=False)
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+
+    data = client.get('/api/balance/me').get_json()
+    assert data['balance'] == 32
+    assert data['interestEarned'] == 2
+    assert data['rank'] == 2
+    assert data['totalStudents'] == 3
+
+
+def test_tied_balances_share_rank(app, client, seeded, add_student):
+    """Students with equal balances get the same rank."""
+    now = datetime.utcnow()
+    with app.app_context():
+        _deposit(seeded['student_id'], 10)
+        add_student('tied', deposits=[(10, now)])
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    assert client.get('/api/balance/me').get_json()['rank'] == 1
+
+
+def test_student_without_transactions_has_no_rank(client, seeded):
+    """A student with no ledger history is unranked, as before."""
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    data = client.get('/api/balance/me').get_json()
+    assert data['balance'] == 0
+    assert data['rank'] is None
+
+
+def test_rank_query_count_is_constant(app, client, seeded, count_queries, add_student):
+    """Ranking among 3 or 40 students issues the same number of statements."""
+    now = datetime.utcnow()
+    with app.app_context():
+        _deposit(seeded['student_id'], 10)
+        for i in range(2):
+            add_student(f'few{i}', deposits=[(i, now)])
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    with count_queries() as small:
+        client.get('/api/balance/me')
+    with app.app_context():
+        for i in range(37):
+            add_student(f'many{i}', deposits=[(i + 20, now)])
+    with count_queries() as large:
+        data = client.get('/api/balance/me').get_json()
+    assert data['rank'] == 38
+    assert data['totalStudents'] == 40
+    assert len(large) == len(small)
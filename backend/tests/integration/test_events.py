@@ -0,0 +1,156 @@
+"""
+Integration tests for the live event stream.
+
+Verifies:
+- Committed awards reach open streams as SSE messages
+- Students only see their own events; teachers can filter by class
+- Closing a stream unsubscribes it
+- Commits made by other workers reach the stream through the ledger tail
+- Ledger rows committed out of id order are published once each
+- Revoking the session ends an open stream
+"""
+import json
+
+import pytest
+from sqlalchemy import insert
+
+from api import db
+from api.events import hub
+from api.models import Transaction, TransactionType
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A file database: the ledger tail polls from its own thread and connection."""
+    from app import create_app
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'events.db'}")
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SECRET_KEY'] = 'test-secret-key'
+    return app
+
+
+def _next_event(chunks):
+    """Read the stream until the next named event; returns (name, data)."""
+    for chunk in chunks:
+        text = chunk.decode()
+        if text.startswith('event: '):
+            name, data = text.strip().split('\n')
+            return name[len('event: '):], json.loads(data[len('data: '):])
+
+
+def test_stream_filters_by_role_and_class(app, seeded, login):
+    teacher = app.test_client()
+    student = app.test_client()
+    watcher = app.test_client()
+    login(teacher)
+    login(student, 'student1', '1234')
+    login(watcher)
+
+    mine = student.get('/api/events', buffered=False)
+    other_class = watcher.get('/api/events?class_name=6B', buffered=False)
+    assert mine.status_code == 200
+    assert mine.mimetype == 'text/event-stream'
+    mine_chunks, other_chunks = iter(mine.response), iter(other_class.response)
+    assert next(mine_chunks).startswith(b'retry:')
+    assert next(other_chunks).startswith(b'retry:')
+    assert hub.subscriber_count() == 2
+
+    teacher.post('/api/transactions/award', json={'studentId': seeded['student_ids'][1]})
+    teacher.post('/api/transactions/award', json={'studentId': seeded['student_id'], 'behaviorId': 1})
+
+    name, data = _next_event(mine_chunks)
+    assert name == 'award'
+    assert data['userId'] == seeded['student_id']
+    assert data['categoryId'] == 1
+
+    # Nothing for 6B; the next event the watcher sees is the roster change below
+    teacher.put(f"/api/students/{seeded['student_ids'][2]}", json={'className': '6B'})
+    teacher.post('/api/transactions/award', json={'studentId': seeded['student_ids'][2]})
+    assert _next_event(other_chunks)[0] == 'roster'
+    name, data = _next_event(other_chunks)
+    assert (name, data['userId']) == ('award', seeded['student_ids'][2])
+
+    mine.close()
+    other_class.close()
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_requires_login(client, seeded):
+    assert client.get('/api/events').status_code == 401
+
+
+def test_stream_receives_commits_from_other_workers(app, seeded, login):
+    """A Core insert sends no signal here, as if another process wrote it; the tail still finds it."""
+    app.config['SSE_POLL_SECONDS'] = 0.05
+    student = app.test_client()
+    login(student, 'student1', '1234')
+    stream = student.get('/api/events', buffered=False)
+    chunks = iter(stream.response)
+    next(chunks)
+
+    db.session.execute(insert(Transaction).values(
+        user_id=seeded['student_id'], amount=5, type=TransactionType.DEPOSIT
+    ))
+    db.session.commit()
+
+    name, data = _next_event(chunks)
+    assert (name, data['userId'], data['amount']) == ('deposit', seeded['student_id'], 5)
+    stream.close()
+
+
+def test_stream_receives_commits_out_of_id_order(app, seeded, login):
+    """A lower id committed after a higher one (as on PostgreSQL) is still published, and nothing twice."""
+    app.config['SSE_POLL_SECONDS'] = 0.05
+    student = app.test_client()
+    login(student, 'student1', '1234')
+    stream = student.get('/api/events', buffered=False)
+    chunks = iter(stream.response)
+    next(chunks)
+
+    for amount, txn_id in ((1, 1000), (2, 500), (3, 1001)):
+        db.session.execute(insert(Transaction).values(
+            id=txn_id, user_id=seeded['student_id'], amount=amount, type=TransactionType.DEPOSIT
+        ))
+        db.session.commit()
+        name, data = _next_event(chunks)
+        assert (name, data['amount']) == ('deposit', amount)
+    stream.close()
+
+
+def test_revoked_session_ends_stream(app, seeded, login):
+    """A PIN reset closes the student's open stream with a "revoked" event."""
+    teacher = app.test_client()
+    student = app.test_client()
+    login(teacher)
+    login(student, 'student1', '1234')
+    stream = student.get('/api/events', buffered=False)
+    chunks = iter(stream.response)
+    next(chunks)
+
+    teacher.put(f"/api/students/{seeded['student_id']}", json={'pin': '4321'})
+
+    assert _next_event(chunks)[0] == 'revoked'
+    assert next(chunks, None) is None
+    assert hub.subscriber_count() == 0
+
+
+def test_stream_rechecks_session_on_heartbeat(app, seeded, login):
+    """A revocation by another worker is found when the heartbeat revalidates against the user row."""
+    from api.models import User
+    app.config['SSE_HEARTBEAT_SECONDS'] = 1
+    app.config['AUTH_REVALIDATE_SECONDS'] = 0
+    student = app.test_client()
+    login(student, 'student1', '1234')
+    stream = student.get('/api/events', buffered=False)
+    chunks = iter(stream.response)
+    next(chunks)
+
+    # A Core update: no listener in this process records the revocation
+    User.query.filter_by(id=seeded['student_id']).update(
+        {'session_version': User.session_version + 1}, synchronize_session=False
+    )
+    db.session.commit()
+
+    assert _next_event(chunks)[0] == 'revoked'
+    stream.close()
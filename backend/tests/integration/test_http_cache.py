@@ -0,0 +1,104 @@
+"""
+Integration tests for conditional GET (ETag / Last-Modified).
+
+Verifies:
+- Polled endpoints send ETag, Last-Modified and Cache-Control
+- A current If-None-Match gets 304 without the endpoint's own queries
+- Writes to the underlying resource change the ETag, including out-of-order ledger ids
+- Unauthenticated requests get 401, never 304
+- If-Modified-Since never misses a change made in the same second
+"""
+from datetime import datetime, timedelta
+
+
+def test_behaviors_304_until_changed(client, seeded, count_queries, login):
+    login(client)
+    r = client.get('/api/behaviors')
+    assert r.status_code == 200
+    etag = r.headers['ETag']
+    assert r.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Last-Modified' in r.headers
+
+    with count_queries() as statements:
+        r = client.get('/api/behaviors', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert r.data == b''
+    assert not [s for s in statements if 'focus_behaviors' in s]
+
+    client.post('/api/behaviors', json={'name': 'Kindness'})
+    r = client.get('/api/behaviors', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    assert r.headers['ETag'] != etag
+    assert 'Kindness' in [b['name'] for b in r.get_json()['behaviors']]
+
+
+def test_classes_and_raffle_follow_roster(client, seeded, login):
+    login(client)
+    classes = client.get('/api/students/classes').headers['ETag']
+    history = client.get('/api/raffle/history').headers['ETag']
+    assert client.get('/api/students/classes', headers={'If-None-Match': classes}).status_code == 304
+
+    client.put(f"/api/students/{seeded['student_id']}", json={'className': '6C'})
+    r = client.get('/api/students/classes', headers={'If-None-Match': classes})
+    assert r.status_code == 200 and r.get_json()['classes'] == ['5A', '6C']
+    assert client.get('/api/raffle/history', headers={'If-None-Match': history}).status_code == 200
+
+
+def test_leaderboard_etag_tracks_ledger(client, seeded, login):
+    login(client)
+    etag = client.get('/api/analytics/leaderboard').headers['ETag']
+    assert client.get('/api/analytics/leaderboard', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/analytics/leaderboard?type=earners', headers={'If-None-Match': etag}).status_code == 200
+
+    client.post('/api/transactions/award', json={'studentId': seeded['student_id']})
+    assert client.get('/api/analytics/leaderboard', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_leaderboard_etag_tracks_out_of_order_commits(client, seeded, login):
+    """A ledger row committed with a lower id than the newest (PostgreSQL sequences) still changes the ETag."""
+    from api import db
+    from api.models import Transaction, TransactionType
+    from api.services.ledger import post_transactions
+    login(client)
+    db.session.add(Transaction(id=1000, user_id=seeded['student_id'], amount=5, type=TransactionType.DEPOSIT))
+    db.session.commit()
+    etag = client.get('/api/analytics/leaderboard').headers['ETag']
+
+    db.session.add(Transaction(id=500, user_id=seeded['student_ids'][1], amount=50, type=TransactionType.DEPOSIT))
+    db.session.commit()
+    r = client.get('/api/analytics/leaderboard', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    etag = r.headers['ETag']
+
+    post_transactions([{'id': 600, 'user_id': seeded['student_ids'][2], 'amount': 60, 'type': TransactionType.DEPOSIT}])
+    db.session.commit()
+    assert client.get('/api/analytics/leaderboard', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_config_if_modified_since(client, seeded, login):
+    """If-Modified-Since gets a 304 once the change's second is over, and never hides a later change."""
+    from api import db
+    from api.models import ResourceVersion
+    login(client, 'admin', 'admin123')
+    client.put('/api/admin/config', json={'interestRate': '2.5'})
+    ResourceVersion.query.filter_by(name='config').update(
+        {'updated_at': datetime.utcnow() - timedelta(seconds=5, microseconds=300000)}
+    )
+    db.session.commit()
+
+    last_modified = client.get('/api/admin/config').headers['Last-Modified']
+    assert client.get('/api/admin/config', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    # Changed within the current second: the header rounds down, so the next check is a 200
+    client.put('/api/admin/config', json={'interestRate': '3.0'})
+    last_modified = client.get('/api/admin/config').headers['Last-Modified']
+    client.put('/api/admin/config', json={'interestRate': '3.5'})
+    r = client.get('/api/admin/config', headers={'If-Modified-Since': last_modified})
+    assert r.status_code == 200
+
+
+def test_unauthenticated_never_304(client, seeded, login):
+    login(client)
+    etag = client.get('/api/behaviors').headers['ETag']
+    client.post('/api/auth/logout')
+    assert client.get('/api/behaviors', headers={'If-None-Match': etag}).status_code == 401
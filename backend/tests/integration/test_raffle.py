@@ -0,0 +1,44 @@
+"""
+Integration tests for raffle endpoints.
+
+Verifies:
+- The draw picks an active student by offset and credits the prize
+- Only the winner's row is loaded, never the whole roster
+- Drawing with no active students is rejected
+"""
+import random
+
+from api import db
+from api.models import User
+
+
+def test_draw_loads_only_winner(app, client, seeded, count_queries, monkeypatch, login):
+    """The offset picks the winner; the response carries the credited balance."""
+    monkeypatch.setattr(random, 'randrange', lambda n: n - 1)
+    login(client)
+    with count_queries() as statements:
+        r = client.post('/api/raffle/draw', json={'prizeAmount': 25})
+    assert r.status_code == 201
+    data = r.get_json()
+    assert data['winner']['id'] == max(seeded['student_ids'])
+    assert data['winner']['balance'] == 25
+    assert data['raffle']['prizeAmount'] == 25
+
+    full_rows = [s for s in statements if s.lstrip().startswith('SELECT users.id, users.username')]
+    assert all('WHERE users.id = ?' in s for s in full_rows)
+
+
+def test_draw_skips_inactive_and_empty_roster(app, client, seeded, login):
+    """Inactive students are never drawn; with none active the draw is rejected."""
+    login(client)
+    with app.app_context():
+        for student_id in seeded['student_ids'][1:]:
+            db.session.get(User, student_id).is_active = False
+        db.session.commit()
+    r = client.post('/api/raffle/draw', json={})
+    assert r.get_json()['winner']['id'] == seeded['student_id']
+
+    with app.app_context():
+        db.session.get(User, seeded['student_id']).is_active = False
+        db.session.commit()
+    assert client.post('/api/raffle/draw', json={}).status_code == 400
@@ -0,0 +1,55 @@
+"""
+Integration tests for the student roster endpoint.
+
+Verifies:
+- include_balance=true returns correct balances
+- The number of SQL statements does not grow with roster size
+"""
+from api import db
+from api.models import User, UserRole, Transaction, TransactionType
+
+
+def _add_students(app, count, start):
+    """Add `count` students in 5A, each with a deposit equal to their index."""
+    with app.app_context():
+        for i in range(start, start + count):
+            s = User(
+                username=f'roster{i}',
+                first_name='Roster',
+                last_name=f'{i:03d}',
+                role=UserRole.STUDENT,
+                class_name='5A'
+            )
+            s.pin_hash = 'unused'
+            db.session.add(s)
+            db.session.flush()
+            db.session.add(Transaction(user_id=s.id, amount=i, type=TransactionType.DEPOSIT))
+        db.session.commit()
+
+
+def test_list_students_includes_balances(client, seeded):
+    """Balances in the roster match each student's ledger."""
+    client.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+    client.post('/api/transactions/deposit', json={'studentId': seeded['student_id'], 'amount': 4})
+    r = client.get('/api/students?include_balance=true')
+    assert r.status_code == 200
+    balances = {s['id']: s['balance'] for s in r.get_json()['students']}
+    assert balances[seeded['student_id']] == 4
+    assert all(balances[sid] == 0 for sid in seeded['student_ids'][1:])
+
+
+def test_list_students_query_count_is_constant(app, client, seeded, count_queries):
+    """Fetching balances for 5 or 50 students issues the same number of statements."""
+    client.post('/api/auth/login', json={'username': 'teacher', 'pin': 'teacher123'})
+
+    _add_students(app, 5, start=1)
+    with count_queries() as small:
+        r = client.get('/api/students?include_balance=true&class_name=5A')
+    assert r.get_json()['count'] == 8
+
+    _add_students(app, 45, start=6)
+    with count_queries() as large:
+        r = client.get('/api/students?include_balance=true&class_name=5A')
+    assert r.get_json()['count'] == 53
+
+    assert len(large) == len(small)
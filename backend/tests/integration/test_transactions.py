@@ -0,0 +1,231 @@
+"""
+Integration tests for transaction endpoints.
+
+Verifies:
+- Batch awards by student ids and by class
+- Batch awards are all-or-nothing on unknown students
+- Batch award ids must be integers (not strings or booleans)
+- Batch award cost does not grow with the number of students
+- Bulk deposit import from CSV and JSON lines, stopping cleanly on unreadable input
+- Cursor pagination of transaction history
+"""
+from datetime import datetime, timedelta
+
+from api import db
+from api.models import User, UserRole, Transaction, TransactionType
+
+
+def test_batch_award_by_ids(client, seeded, login):
+    """Each listed student gets exactly one AWARD and their new balance is returned."""
+    login(client)
+    ids = seeded['student_ids']
+    client.post('/api/transactions/deposit', json={'studentId': ids[0], 'amount': 5})
+
+    r = client.post('/api/transactions/award/batch', json={
+        'studentIds': [ids[0], ids[1], ids[0]], 'behaviorId': 1, 'notes': 'Table 3'
+    })
+    assert r.status_code == 201
+    data = r.get_json()
+    assert data['awarded'] == 2
+    assert data['balances'] == [
+        {'studentId': ids[0], 'newBalance': 6},
+        {'studentId': ids[1], 'newBalance': 1},
+    ]
+
+    history = client.get(f"/api/transactions?user_id={ids[1]}").get_json()['transactions']
+    assert history[0]['type'] == 'award'
+    assert history[0]['categoryName'] == 'Helping Others'
+    assert history[0]['notes'] == 'Table 3'
+
+
+def test_batch_award_by_class(app, client, seeded, login):
+    """className awards every active student in that class."""
+    with app.app_context():
+        db.session.add(User(username='other', first_name='O', last_name='Ther',
+                            role=UserRole.STUDENT, class_name='6B', pin_hash='x'))
+        db.session.commit()
+    login(client)
+    r = client.post('/api/transactions/award/batch', json={'className': '5A'})
+    assert r.status_code == 201
+    assert sorted(b['studentId'] for b in r.get_json()['balances']) == sorted(seeded['student_ids'])
+
+
+def test_batch_award_unknown_student_awards_nobody(app, client, seeded, login):
+    """An unknown id rejects the whole batch."""
+    login(client)
+    r = client.post('/api/transactions/award/batch', json={
+        'studentIds': [seeded['student_id'], 9999]
+    })
+    assert r.status_code == 404
+    assert r.get_json()['missingStudentIds'] == [9999]
+    with app.app_context():
+        assert Transaction.query.filter_by(type=TransactionType.AWARD).count() == 0
+
+
+def test_batch_award_rejects_non_integer_ids(client, seeded, login):
+    """JSON true is not student id 1, and strings are not ids."""
+    login(client)
+    for ids in ([True], [seeded['student_id'], False], [str(seeded['student_id'])]):
+        r = client.post('/api/transactions/award/batch', json={'studentIds': ids})
+        assert r.status_code == 400
+        assert r.get_json()['error'] == 'studentIds must be an array of integers'
+
+
+def test_batch_award_query_count_is_constant(app, client, seeded, count_queries, login):
+    """Awarding 3 or 30 students issues the same number of statements."""
+    with app.app_context():
+        for i in range(27):
+            db.session.add(User(username=f'many{i}', first_name='M', last_name=str(i),
+                                role=UserRole.STUDENT, class_name='5B', pin_hash='x'))
+        db.session.commit()
+    login(client)
+    with count_queries() as small:
+        client.post('/api/transactions/award/batch', json={'className': '5A'})
+    with count_queries() as large:
+        r = client.post('/api/transactions/award/batch', json={'className': '5B'})
+    assert r.get_json()['awarded'] == 27
+    assert len(large) == len(small)
+
+
+def test_deposit_import_csv_reports_row_errors(app, client, seeded, login):
+    """Valid CSV rows are deposited; bad rows are reported by row number."""
+    login(client)
+    ids = seeded['student_ids']
+    body = (
+        'studentId,username,amount,notes\n'
+        f'{ids[0]},,5,Week 6\n'
+        ',student2,3,\n'
+        '9999,,4,\n'
+        f'{ids[2]},,-1,\n'
+        f'{ids[0]},,2,\n'
+    )
+    r = client.post('/api/transactions/deposit/import', data=body, content_type='text/csv')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data['rowsRead'] == 5
+    assert data['imported'] == 3
+    assert data['totalAmount'] == 10
+    assert data['errors'] == [
+        {'row': 4, 'error': 'Student not found'},
+        {'row': 5, 'error': 'Amount must be a positive integer'},
+    ]
+    with app.app_context():
+        assert User.query.get(ids[0]).balance == 7
+        assert User.query.get(ids[1]).balance == 3
+
+
+def test_deposit_import_jsonl_in_chunks(app, client, seeded, monkeypatch, login):
+    """JSON lines are written in chunks, each validated with one roster query."""
+    from api.services import deposit_import
+    monkeypatch.setattr(deposit_import, 'IMPORT_CHUNK_SIZE', 4)
+    login(client)
+    sid = seeded['student_id']
+    lines = [f'{{"studentId": {sid}, "amount": 1}}' for _ in range(10)] + ['not json', '']
+    r = client.post('/api/transactions/deposit/import', data='\n'.join(lines),
+                    content_type='application/x-ndjson')
+    data = r.get_json()
+    assert data['imported'] == 10
+    assert data['errors'] == [{'row': 11, 'error': 'Invalid JSON object'}]
+    with app.app_context():
+        assert User.query.get(sid).balance == 10
+        assert Transaction.query.filter_by(type=TransactionType.DEPOSIT).count() == 10
+
+
+def test_deposit_import_rejects_bad_header_and_type(client, seeded, login):
+    """A CSV without the required columns or an unknown content type is rejected."""
+    login(client)
+    r = client.post('/api/transactions/deposit/import', data='name,value\nx,1\n', content_type='text/csv')
+    assert r.status_code == 400
+    r = client.post('/api/transactions/deposit/import', data='{}', content_type='application/json')
+    assert r.status_code == 415
+
+
+def test_deposit_import_stops_at_undecodable_bytes(app, client, seeded, monkeypatch, login):
+    """A non-UTF-8 row ends the import with a 400 that reports the rows already written."""
+    from api.services import deposit_import
+    monkeypatch.setattr(deposit_import, 'IMPORT_CHUNK_SIZE', 100)
+    login(client)
+    sid = seeded['student_id']
+    good = ''.join(f'{sid},1,Week 6 cash-in {i:04d}\n' for i in range(1000))
+    body = ('studentId,amount,notes\n' + good).encode() + f'{sid},1,Caf\u00e9\n'.encode('cp1252')
+    r = client.post('/api/transactions/deposit/import', data=body, content_type='text/csv')
+    assert r.status_code == 400
+    data = r.get_json()
+    assert data['success'] is False
+    assert 'not UTF-8' in data['error']
+    assert 0 < data['imported'] <= 1000
+    with app.app_context():
+        assert User.query.get(sid).balance == data['imported']
+
+
+def _add_history(student_id, count):
+    """`count` deposits, with pairs sharing a timestamp to exercise the id tie-break."""
+    base = datetime(2026, 3, 1, 9, 0, 0)
+    for i in range(count):
+        db.session.add(Transaction(user_id=student_id, amount=i + 1, type=TransactionType.DEPOSIT,
+                                   created_at=base + timedelta(minutes=i // 2)))
+    db.session.commit()
+
+
+def test_cursor_pagination_walks_history_once(app, client, seeded, login):
+    """Following nextCursor returns every row exactly once, newest first."""
+    with app.app_context():
+        _add_history(seeded['student_id'], 7)
+    login(client)
+
+    seen = []
+    url = '/api/transactions?limit=3'
+    while url:
+        data = client.get(url).get_json()
+        assert 'total' not in data
+        seen.extend(t['amount'] for t in data['transactions'])
+        url = f"/api/transactions?limit=3&cursor={data['nextCursor']}" if data['nextCursor'] else None
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_cursor_pagination_with_filters_and_total(app, client, seeded, login):
+    """Filters apply to every page; include_total counts the filtered history."""
+    with app.app_context():
+        _add_history(seeded['student_id'], 4)
+        _add_history(seeded['student_ids'][1], 3)
+    login(client)
+
+    first = client.get(
+        f"/api/transactions?user_id={seeded['student_id']}&type=deposit&limit=2&include_total=true"
+    ).get_json()
+    assert first['total'] == 4
+    second = client.get(
+        f"/api/transactions?user_id={seeded['student_id']}&type=deposit&limit=2&cursor={first['nextCursor']}"
+    ).get_json()
+    assert [t['amount'] for t in second['transactions']] == [2, 1]
+    assert {t['userId'] for t in second['transactions']} == {seeded['student_id']}
+    assert second['nextCursor'] is None
+
+
+def test_invalid_cursor_and_legacy_offset(app, client, seeded, login):
+    """A garbled cursor is a 400; offset paging still works without a cursor."""
+    with app.app_context():
+        _add_history(seeded['student_id'], 5)
+    login(client)
+    assert client.get('/api/transactions?cursor=not-a-cursor').status_code == 400
+    data = client.get('/api/transactions?limit=2&offset=2').get_json()
+    assert [t['amount'] for t in data['transactions']] == [3, 2]
+    assert data['offset'] == 2
+
+
+def test_history_page_query_count_is_constant(app, client, seeded, count_queries, login):
+    """Serializing categorized rows does not lazy-load one behavior per row."""
+    with app.app_context():
+        for i in range(30):
+            db.session.add(Transaction(user_id=seeded['student_id'], amount=1,
+                                       type=TransactionType.AWARD, category_id=(i % 3) + 1))
+        db.session.commit()
+    login(client)
+    with count_queries() as small:
+        r = client.get('/api/transactions?limit=2')
+    assert r.get_json()['transactions'][0]['categoryName'] is not None
+    with count_queries() as large:
+        r = client.get('/api/transactions?limit=30')
+    names = {t['categoryName'] for t in r.get_json()['transactions']}
+    assert names == {'Helping Others', 'On Task', 'Respectful'}
+    assert len(large) == len(small)
@@ -0,0 +1,86 @@
+"""
+Unit tests for the materialized account_balances table.
+
+Verifies:
+- Every ledger insert updates the stored balance in the same transaction
+- Rolled-back inserts leave the stored balance untouched
+- Reconciliation reports drift and rebuilds from the ledger
+"""
+import pytest
+
+from api import db
+from api.models import User, UserRole, Transaction, TransactionType, AccountBalance
+from api.services.balances import reconcile_balances
+
+
+@pytest.fixture
+def student_id(app, db):
+    """Single active student with no transactions. Returns student id (int)."""
+    with app.app_context():
+        student = User(
+            username='bal1',
+            first_name='Bal',
+            last_name='One',
+            role=UserRole.STUDENT,
+            class_name='5A'
+        )
+        student.set_pin('1234')
+        db.session.add(student)
+        db.session.commit()
+        return student.id
+
+
+def _stored_balance(user_id):
+    return db.session.query(AccountBalance.balance).filter_by(user_id=user_id).scalar()
+
+
+def test_insert_updates_stored_balance(app, student_id):
+    """Each Transaction insert adds its amount to account_balances."""
+    with app.app_context():
+        db.session.add(Transaction(user_id=student_id, amount=10, type=TransactionType.DEPOSIT))
+        db.session.add(Transaction(user_id=student_id, amount=1, type=TransactionType.AWARD))
+        db.session.commit()
+        db.session.add(Transaction(user_id=student_id, amount=-3, type=TransactionType.SPEND))
+        db.session.commit()
+        assert _stored_balance(student_id) == 8
+        assert User.query.get(student_id).balance == 8
+
+
+def test_rollback_leaves_stored_balance_unchanged(app, student_id):
+    """A rolled-back insert must not leak into account_balances."""
+    with app.app_context():
+        db.session.add(Transaction(user_id=student_id, amount=5, type=TransactionType.DEPOSIT))
+        db.session.commit()
+        db.session.add(Transaction(user_id=student_id, amount=100, type=TransactionType.DEPOSIT))
+        db.session.flush()
+        db.session.rollback()
+        assert _stored_balance(student_id) == 5
+
+
+def test_reconcile_reports_and_repairs_drift(app, student_id):
+    """Reconciliation finds a corrupted balance and rebuilds it from the ledger."""
+    with app.app_context():
+        db.session.add(Transaction(user_id=student_id, amount=7, type=TransactionType.DEPOSIT))
+        db.session.commit()
+        db.session.query(AccountBalance).filter_by(user_id=student_id).update({'balance': 999})
+        db.session.commit()
+
+        dry = reconcile_balances(repair=False)
+        assert dry['repaired'] is False
+        assert dry['drift'] == [{'userId': student_id, 'ledgerBalance': 7, 'storedBalance': 999}]
+        assert _stored_balance(student_id) == 999
+
+        result = reconcile_balances()
+        assert result['repaired'] is True
+        assert _stored_balance(student_id) == 7
+        assert reconcile_balances()['drift'] == []
+
+
+def test_reconcile_cli_command(app, student_id):
+    """`flask balances reconcile` prints a drift summary."""
+    with app.app_context():
+        db.session.add(Transaction(user_id=student_id, amount=2, type=TransactionType.DEPOSIT))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['balances', 'reconcile', '--dry-run'])
+    assert result.exit_code == 0
+    assert '0 drifted' in result.output
@@ -0,0 +1,65 @@
+"""
+Unit tests for the SQLite engine tuning profile.
+
+Verifies:
+- Profile resolution and per-setting overrides
+- PRAGMAs are applied to the app's own connections only
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from api.engine import sqlite_pragmas
+
+
+def test_tuned_profile_defaults():
+    """The tuned profile enables WAL with NORMAL sync and a busy timeout."""
+    pragmas = sqlite_pragmas({'SQLITE_PROFILE': 'tuned'})
+    assert pragmas['journal_mode'] == 'WAL'
+    assert pragmas['synchronous'] == 'NORMAL'
+    assert pragmas['busy_timeout'] == 5000
+
+
+def test_overrides_and_off_profile():
+    """Env-style overrides replace profile values; "off" applies nothing."""
+    pragmas = sqlite_pragmas({
+        'SQLITE_PROFILE': 'tuned',
+        'SQLITE_BUSY_TIMEOUT_MS': '250',
+        'SQLITE_MMAP_SIZE_MB': '16',
+        'SQLITE_CACHE_SIZE_MB': '8',
+    })
+    assert pragmas['busy_timeout'] == 250
+    assert pragmas['mmap_size'] == 16 * 1024 * 1024
+    assert pragmas['cache_size'] == -8 * 1024
+    assert sqlite_pragmas({'SQLITE_PROFILE': 'off', 'SQLITE_BUSY_TIMEOUT_MS': '1'}) == {}
+
+
+def test_unknown_profile_rejected():
+    """A typo in SQLITE_PROFILE fails loudly at startup."""
+    with pytest.raises(ValueError):
+        sqlite_pragmas({'SQLITE_PROFILE': 'fast'})
+
+
+def test_pragmas_applied_on_connect(tmp_path, monkeypatch):
+    """New connections of the app's engine carry the tuned settings; other engines do not."""
+    from api import db
+    from app import create_app
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'app.db'}")
+    app = create_app()
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        db.engine.dispose()
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'delete'
+    finally:
+        engine.dispose()
+
+
+def test_tests_use_in_memory_database(app, db):
+    """The suite never touches the instance database."""
+    assert db.engine.url.database == ':memory:'
@@ -6,14 +6,16 @@ Verifies:
 - No interest when rate is 0
 - No interest for zero/negative balance
 - Daily snapshot creation
+- Interest runs are paid at most once per ISO week and resume after failure
+- A Sunday crash retried on Monday resumes the Sunday's week
 """
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 import pytest
 
 from api import db
 from api.models import (
     User, UserRole, Transaction, TransactionType,
-    DailySnapshot, SystemConfig,
+    DailySnapshot, SystemConfig, InterestRun, InterestRunStatus,
 )
 from api.services import interest
 
@@ -66,8 +68,9 @@ def snapshots_for_week(app, one_student):
 def test_take_daily_snapshot_creates_one_per_student(app, one_student):
     """Daily snapshot should be created for each active student."""
     with app.app_context():
-        count = interest.take_daily_snapshot()
-    assert count == 1
+        result = interest.take_daily_snapshot()
+    assert result['snapshotsCreated'] == 1
+    assert result['durationMs'] >= 0
     with app.app_context():
         snap = DailySnapshot.query.filter_by(user_id=one_student, date=date.today()).first()
         assert snap is not None
@@ -78,8 +81,31 @@ def test_take_daily_snapshot_idempotent(app, one_student):
     """Running snapshot twice for same day should not duplicate."""
     with app.app_context():
         interest.take_daily_snapshot()
-        count2 = interest.take_daily_snapshot()
-    assert count2 == 0
+        result2 = interest.take_daily_snapshot()
+    assert result2['snapshotsCreated'] == 0
+
+
+def test_take_daily_snapshot_single_statement(app, one_student, count_queries):
+    """Snapshot cost does not depend on the number of students."""
+    with app.app_context():
+        with count_queries() as statements:
+            interest.take_daily_snapshot()
+    inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+    assert len(inserts) == 1
+
+
+def test_take_daily_snapshot_skips_inactive_and_staff(app, one_student):
+    """Only active students are snapshotted."""
+    with app.app_context():
+        inactive = User(username='gone', first_name='G', last_name='One',
+                        role=UserRole.STUDENT, is_active=False, pin_hash='x')
+        teacher = User(username='teach', first_name='T', last_name='One',
+                       role=UserRole.TEACHER, pin_hash='x')
+        db.session.add_all([inactive, teacher])
+        db.session.commit()
+        result = interest.take_daily_snapshot()
+        assert result['snapshotsCreated'] == 1
+        assert DailySnapshot.query.count() == 1
 
 
 def test_interest_skipped_when_rate_zero(app, one_student, snapshots_for_week):
@@ -145,3 +171,176 @@ def test_interest_creates_transaction(app, one_student, snapshots_for_week):
     assert tx is not None
     assert tx.amount == 1
     assert 'min balance' in (tx.notes or '').lower()
+
+
+def test_interest_dry_run_returns_plan_without_writing(app, one_student, snapshots_for_week):
+    """Dry run reports the per-student plan but creates no transactions."""
+    with app.app_context():
+        SystemConfig.set('interest_rate', '10')
+        result = interest.calculate_weekly_interest(dry_run=True)
+        assert result['dryRun'] is True
+        assert result['plan'] == [{
+            'userId': one_student,
+            'name': 'Stu One',
+            'minBalance': 50,
+            'interest': 5
+        }]
+        assert result['totalInterestDistributed'] == 5
+        assert Transaction.query.filter_by(type=TransactionType.INTEREST).count() == 0
+        assert User.query.get(one_student).balance == 100
+
+
+def test_interest_bulk_run_updates_balances(app, one_student):
+    """Bulk-inserted interest rows are reflected in the materialized balance."""
+    with app.app_context():
+        other = User(username='stu2', first_name='Stu', last_name='Two',
+                     role=UserRole.STUDENT, class_name='5A', pin_hash='x')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Transaction(user_id=other.id, amount=200, type=TransactionType.DEPOSIT))
+        db.session.commit()
+        other_id = other.id
+
+        SystemConfig.set('interest_rate', '10')
+        result = interest.calculate_weekly_interest()
+        assert result['studentsReceivingInterest'] == 2
+        assert result['totalInterestDistributed'] == 30
+        assert User.query.get(one_student).balance == 110
+        assert User.query.get(other_id).balance == 220
+
+
+def test_interest_rerun_same_week_is_noop(app, one_student):
+    """A second run for the same week pays nothing and reports the completed run."""
+    with app.app_context():
+        SystemConfig.set('interest_rate', '10')
+        first = interest.calculate_weekly_interest()
+        second = interest.calculate_weekly_interest()
+        assert first['run']['status'] == 'completed'
+        assert second['skipped'] is True
+        assert 'already paid' in second['reason']
+        assert Transaction.query.filter_by(type=TransactionType.INTEREST).count() == 1
+        assert User.query.get(one_student).balance == 110
+
+
+def test_interest_run_recorded_per_week(app, one_student):
+    """Runs for different weeks are tracked separately."""
+    with app.app_context():
+        SystemConfig.set('interest_rate', '10')
+        today = date.today()
+        interest.calculate_weekly_interest(today=today)
+        interest.calculate_weekly_interest(today=today + timedelta(days=7))
+        runs = InterestRun.query.order_by(InterestRun.week).all()
+        assert [r.week for r in runs] == [
+            interest.week_key(today), interest.week_key(today + timedelta(days=7))
+        ]
+        assert all(r.status == InterestRunStatus.COMPLETED for r in runs)
+        assert [r.total_paid for r in runs] == [10, 11]
+
+
+def test_failed_run_resumes_without_double_paying(app, one_student):
+    """A failed run that already paid a student resumes with the remaining students."""
+    with app.app_context():
+        other = User(username='stu2', first_name='Stu', last_name='Two',
+                     role=UserRole.STUDENT, class_name='5A', pin_hash='x')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Transaction(user_id=other.id, amount=50, type=TransactionType.DEPOSIT))
+        SystemConfig.set('interest_rate', '10')
+        other_id = other.id
+
+        # Simulate a run that paid the first student and then crashed
+        started = datetime.utcnow() - timedelta(minutes=1)
+        db.session.add(InterestRun(
+            week=interest.week_key(date.today()),
+            status=InterestRunStatus.FAILED,
+            interest_rate=10.0,
+            started_at=started,
+            heartbeat_at=started,
+            student_count=1,
+            total_paid=10
+        ))
+        db.session.add(Transaction(user_id=one_student, amount=10, type=TransactionType.INTEREST))
+        db.session.commit()
+
+        result = interest.calculate_weekly_interest()
+        assert result['resumed'] is True
+        assert result['studentsReceivingInterest'] == 2
+        assert result['totalInterestDistributed'] == 15
+        assert User.query.get(one_student).balance == 110
+        assert User.query.get(other_id).balance == 55
+
+
+def test_active_run_is_not_taken_over(app, one_student):
+    """A RUNNING run with a fresh heartbeat belongs to another process."""
+    with app.app_context():
+        SystemConfig.set('interest_rate', '10')
+        db.session.add(InterestRun(
+            week=interest.week_key(date.today()),
+            status=InterestRunStatus.RUNNING,
+            interest_rate=10.0,
+            heartbeat_at=datetime.utcnow()
+        ))
+        db.session.commit()
+        result = interest.calculate_weekly_interest()
+        assert result['skipped'] is True
+        assert 'in progress' in result['reason']
+        assert Transaction.query.filter_by(type=TransactionType.INTEREST).count() == 0
+
+
+def test_stale_run_is_resumed(app, one_student):
+    """A RUNNING run whose heartbeat went stale is taken over and completed."""
+    with app.app_context():
+        SystemConfig.set('interest_rate', '10')
+        stale = datetime.utcnow() - interest.STALE_RUN_AFTER - timedelta(minutes=1)
+        db.session.add(InterestRun(
+            week=interest.week_key(date.today()),
+            status=InterestRunStatus.RUNNING,
+            interest_rate=10.0,
+            started_at=stale,
+            heartbeat_at=stale
+        ))
+        db.session.commit()
+        result = interest.calculate_weekly_interest()
+        assert result['run']['status'] == 'completed'
+        assert result['totalInterestDistributed'] == 10
+
+
+def test_sunday_crash_resumed_on_monday(app, one_student, monkeypatch):
+    """The Monday retry finishes the Sunday's week; the next Sunday still pays its own week."""
+    with app.app_context():
+        ids = [one_student]
+        for n in (2, 3):
+            student = User(username=f'stu{n}', first_name='Stu', last_name=str(n),
+                           role=UserRole.STUDENT, class_name='5A', pin_hash='x')
+            db.session.add(student)
+            db.session.flush()
+            db.session.add(Transaction(user_id=student.id, amount=100, type=TransactionType.DEPOSIT))
+            ids.append(student.id)
+        SystemConfig.set('interest_rate', '10')
+
+        calls = []
+        real_post = interest.post_transactions
+
+        def crash_on_second_chunk(rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError('worker killed')
+            return real_post(rows)
+
+        monkeypatch.setattr(interest, 'RUN_CHUNK_SIZE', 1)
+        monkeypatch.setattr(interest, 'post_transactions', crash_on_second_chunk)
+        sunday = date(2026, 10, 18)
+        with pytest.raises(RuntimeError):
+            interest.calculate_weekly_interest(today=sunday)
+
+        result = interest.calculate_weekly_interest(today=sunday + timedelta(days=1))
+        assert result['week'] == '2026-W42'
+        assert result['resumed'] is True
+        assert [User.query.get(i).balance for i in ids] == [110, 110, 110]
+
+        result = interest.calculate_weekly_interest(today=sunday + timedelta(days=7))
+        assert result['week'] == '2026-W43'
+        assert [User.query.get(i).balance for i in ids] == [121, 121, 121]
+        assert [(r.week, r.status) for r in InterestRun.query.order_by(InterestRun.week)] == [
+            ('2026-W42', InterestRunStatus.COMPLETED), ('2026-W43', InterestRunStatus.COMPLETED)
+        ]
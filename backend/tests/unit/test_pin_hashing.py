@@ -0,0 +1,58 @@
+"""
+Unit tests for per-role PIN/password hashing.
+
+Verifies:
+- set_pin uses the hash method configured for the user's role
+- needs_rehash detects hashes made with other parameters
+- Login upgrades an outdated hash without revoking the user's sessions
+"""
+from api import db
+from api.models import User, UserRole
+
+
+def test_set_pin_uses_role_method(app, seeded):
+    """Students and staff get their own configured hash methods."""
+    app.config['PASSWORD_HASH_METHODS'] = {'student': 'pbkdf2:sha256:1000', 'teacher': 'scrypt:16384:8:1'}
+    with app.app_context():
+        student = db.session.get(User, seeded['student_id'])
+        teacher = db.session.get(User, seeded['teacher_id'])
+        student.set_pin('1234')
+        teacher.set_pin('secret')
+        assert student.pin_hash.startswith('pbkdf2:sha256:1000$')
+        assert teacher.pin_hash.startswith('scrypt:16384:8:1$')
+        assert student.check_pin('1234') and not student.check_pin('4321')
+        assert not student.needs_rehash() and not teacher.needs_rehash()
+
+
+def test_needs_rehash_after_parameter_change(app, seeded):
+    """Changing the configured method flags existing hashes, defaults included."""
+    with app.app_context():
+        user = User(username='hashy', first_name='H', last_name='Y', role=UserRole.STUDENT)
+        app.config['PASSWORD_HASH_METHODS'] = {'student': 'pbkdf2:sha256:1000'}
+        user.set_pin('1234')
+        assert not user.needs_rehash()
+        app.config['PASSWORD_HASH_METHODS'] = {'student': 'pbkdf2:sha256:2000'}
+        assert user.needs_rehash()
+        app.config['PASSWORD_HASH_METHODS'] = {}
+        assert user.needs_rehash()
+        user.set_pin('1234')
+        assert not user.needs_rehash()  # Werkzeug default, compared with its filled-in parameters
+
+
+def test_login_rehashes_without_revoking_sessions(app, client, seeded):
+    """An outdated hash is replaced on login; session_version is unchanged."""
+    with app.app_context():
+        student = db.session.get(User, seeded['student_id'])
+        assert student.pin_hash.startswith('pbkdf2:sha256:50000$')
+        version = student.session_version
+
+    app.config['PASSWORD_HASH_METHODS'] = dict(app.config['PASSWORD_HASH_METHODS'], student='pbkdf2:sha256:1000')
+    r = client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    assert r.status_code == 200
+    with app.app_context():
+        db.session.expire_all()
+        student = db.session.get(User, seeded['student_id'])
+        assert student.pin_hash.startswith('pbkdf2:sha256:1000$')
+        assert student.session_version == version
+    assert client.get('/api/balance/me').status_code == 200
+    assert client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'}).status_code == 200
@@ -0,0 +1,121 @@
+"""
+Query-plan tests for the hot ledger and roster queries.
+
+Each test captures the SQL an endpoint or job actually runs and checks
+SQLite's EXPLAIN QUERY PLAN: the large tables (transactions, daily_snapshots,
+users) must be searched through an index, never fully scanned.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from api import db
+from api.models import SystemConfig
+from api.services import interest
+
+
+LARGE_TABLES = ('transactions', 'daily_snapshots', 'users')
+
+
+@contextmanager
+def captured_selects():
+    """Record (statement, parameters) for every SELECT sent to the engine."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def query_plan(statement, parameters):
+    """EXPLAIN QUERY PLAN detail lines for one captured statement."""
+    rows = db.session.connection().exec_driver_sql(
+        f'EXPLAIN QUERY PLAN {statement}', parameters
+    ).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(captured, table_substring):
+    """Plan lines that fully scan a large table, for statements touching `table_substring`."""
+    scans = []
+    for statement, parameters in captured:
+        if table_substring not in statement:
+            continue
+        for detail in query_plan(statement, parameters):
+            for table in LARGE_TABLES:
+                if detail.startswith(f'SCAN {table}') and 'INDEX' not in detail:
+                    scans.append((statement, detail))
+    return scans
+
+
+def test_interest_earned_uses_covering_index(app, client, seeded):
+    """SUM(amount) per user and type is answered from ix_transactions_user_type_amount."""
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    with captured_selects() as captured:
+        client.get('/api/balance/me')
+    plans = [
+        detail
+        for statement, parameters in captured if 'FROM transactions' in statement
+        for detail in query_plan(statement, parameters)
+    ]
+    assert any('ix_transactions_user_type_amount' in d for d in plans), plans
+    assert full_scans(captured, 'transactions') == []
+
+
+def test_behavior_breakdown_reads_rollups_by_date(app, teacher_client):
+    """The breakdown reads daily rollups in the date window and never touches the ledger."""
+    with captured_selects() as captured:
+        teacher_client.get('/api/analytics/behavior-breakdown?days=30')
+    rollup_reads = [(s, p) for s, p in captured if 'daily_activity_rollups' in s]
+    assert len(rollup_reads) == 2
+    assert not [s for s, _ in captured if 'transactions' in s]
+    for statement, parameters in rollup_reads:
+        plan = query_plan(statement, parameters)
+        assert any(d.startswith('SEARCH daily_activity_rollups') and '(date>?)' in d for d in plan), plan
+
+
+def test_earners_leaderboard_uses_index(app, teacher_client):
+    """This week's earnings are range-searched on created_at."""
+    with captured_selects() as captured:
+        teacher_client.get('/api/analytics/leaderboard?type=earners&class_name=5A')
+    assert full_scans(captured, 'transactions') == []
+
+
+def test_roster_by_class_uses_index(app, teacher_client):
+    """Active students of a class come from ix_users_role_active_class."""
+    with captured_selects() as captured:
+        teacher_client.get('/api/students?class_name=5A&include_balance=true')
+    assert full_scans(captured, 'users') == []
+
+
+def test_weekly_interest_plan_uses_indexes(app, seeded):
+    """The weekly MIN(balance) aggregate and roster join avoid full scans."""
+    with app.app_context():
+        with captured_selects() as captured:
+            interest.plan_weekly_interest(float(SystemConfig.get('interest_rate')))
+        assert full_scans(captured, 'daily_snapshots') == []
+
+
+def test_savings_rank_uses_balance_index(app, client, seeded):
+    """The rank count range-searches the balance index instead of walking every student."""
+    from api.models import Transaction, TransactionType
+    with app.app_context():
+        db.session.add(Transaction(user_id=seeded['student_id'], amount=5, type=TransactionType.DEPOSIT))
+        db.session.commit()
+    client.post('/api/auth/login', json={'username': 'student1', 'pin': '1234'})
+    client.get('/api/balance/me')  # Caches totalStudents
+    with captured_selects() as captured:
+        assert client.get('/api/balance/me').get_json()['rank'] == 1
+    plans = [
+        detail
+        for statement, parameters in captured if 'EXISTS' in statement
+        for detail in query_plan(statement, parameters)
+    ]
+    assert any('ix_account_balances_balance (balance>?)' in d for d in plans), plans
+    assert full_scans(captured, 'account_balances') == []
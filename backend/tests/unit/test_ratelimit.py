@@ -0,0 +1,50 @@
+"""
+Unit tests for the sliding-window rate limiter.
+
+Verifies:
+- Attempts over the limit are rejected with the wait until the oldest ages out
+- The window slides (no burst at fixed boundaries)
+- Rejected attempts are counted but not recorded; reset forgets a key
+"""
+import pytest
+
+from api import ratelimit
+from api.ratelimit import SlidingWindowLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the limiter module."""
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_rejects_over_limit_and_slides(clock):
+    limiter = SlidingWindowLimiter('test_slide')
+    assert limiter.hit('k', 3, 60) == 0
+    clock[0] += 30
+    assert limiter.hit('k', 3, 60) == 0
+    assert limiter.hit('k', 3, 60) == 0
+    assert limiter.hit('k', 3, 60) == pytest.approx(30)
+    assert limiter.hit('other', 3, 60) == 0  # Keys are independent
+
+    clock[0] += 30  # First attempt ages out; the two later ones still count
+    assert limiter.hit('k', 3, 60) == 0
+    assert limiter.hit('k', 3, 60) == pytest.approx(30)
+    assert limiter.stats() == {'trackedKeys': 2, 'allowed': 5, 'rejected': 2}
+
+
+def test_reset_and_sweep(clock, monkeypatch):
+    limiter = SlidingWindowLimiter('test_sweep')
+    limiter.hit('k', 1, 60)
+    assert limiter.hit('k', 1, 60) > 0
+    limiter.reset('k')
+    assert limiter.hit('k', 1, 60) == 0
+
+    monkeypatch.setattr(SlidingWindowLimiter, 'SWEEP_THRESHOLD', 2)
+    limiter.hit('a', 1, 60)
+    limiter.hit('b', 1, 60)
+    clock[0] += 61
+    limiter.hit('c', 1, 60)
+    assert limiter.stats()['trackedKeys'] == 1
@@ -0,0 +1,108 @@
+"""
+Unit tests for the daily_activity_rollups table.
+
+Verifies:
+- ORM and bulk ledger inserts add to the rollups in the same transaction
+- Missing class / behavior use the '' / 0 sentinels
+- Rolled-back inserts leave the rollups untouched
+- Rebuilding from the ledger reproduces the incremental rollups
+- A student's history moves with them when they change class
+"""
+from datetime import datetime, date
+
+from api import db
+from api.models import Transaction, TransactionType, DailyActivityRollup, User, UserRole
+from api.services.ledger import post_transactions
+from api.services.rollups import rebuild_rollups
+
+
+def _rollups():
+    return {
+        (r.date, r.class_name, r.type, r.category_id): (r.tx_count, r.amount_total)
+        for r in DailyActivityRollup.query.all()
+    }
+
+
+def test_orm_and_bulk_inserts_update_rollups(app, seeded):
+    """Single awards and bulk posts land in the same per-day buckets."""
+    day = datetime(2026, 3, 2, 9, 30)
+    with app.app_context():
+        no_class = User(username='nc', first_name='N', last_name='C', role=UserRole.STUDENT, pin_hash='x')
+        db.session.add(no_class)
+        db.session.flush()
+        db.session.add(Transaction(user_id=seeded['student_id'], amount=1, type=TransactionType.AWARD,
+                                   category_id=1, created_at=day))
+        db.session.add(Transaction(user_id=seeded['student_id'], amount=1, type=TransactionType.AWARD,
+                                   created_at=day))
+        db.session.commit()
+        post_transactions([
+            {'user_id': sid, 'amount': 1, 'type': TransactionType.AWARD, 'category_id': 1, 'created_at': day}
+            for sid in seeded['student_ids']
+        ])
+        post_transactions([{'user_id': no_class.id, 'amount': 7, 'type': TransactionType.DEPOSIT, 'created_at': day}])
+        db.session.commit()
+
+        assert _rollups() == {
+            (date(2026, 3, 2), '5A', TransactionType.AWARD, 1): (4, 4),
+            (date(2026, 3, 2), '5A', TransactionType.AWARD, 0): (1, 1),
+            (date(2026, 3, 2), '', TransactionType.DEPOSIT, 0): (1, 7),
+        }
+
+
+def test_rollback_leaves_rollups_unchanged(app, seeded):
+    """A rolled-back insert must not leak into the rollups."""
+    with app.app_context():
+        db.session.add(Transaction(user_id=seeded['student_id'], amount=5, type=TransactionType.DEPOSIT))
+        db.session.commit()
+        before = _rollups()
+        db.session.add(Transaction(user_id=seeded['student_id'], amount=100, type=TransactionType.DEPOSIT))
+        db.session.flush()
+        db.session.rollback()
+        assert _rollups() == before
+
+
+def test_rebuild_matches_incremental(app, seeded):
+    """rebuild_rollups recomputes exactly what the write path maintained."""
+    with app.app_context():
+        for i, tx_type in enumerate([TransactionType.DEPOSIT, TransactionType.AWARD, TransactionType.INTEREST]):
+            db.session.add(Transaction(user_id=seeded['student_ids'][i], amount=i + 1, type=tx_type,
+                                       category_id=2 if tx_type == TransactionType.AWARD else None,
+                                       created_at=datetime(2026, 3, i + 1, 12)))
+        db.session.commit()
+        expected = _rollups()
+        assert len(expected) == 3
+
+        DailyActivityRollup.query.delete()
+        db.session.commit()
+        assert rebuild_rollups() == 3
+        assert _rollups() == expected
+
+
+def test_class_change_moves_history(app, seeded):
+    """Rollups follow the current roster, so they still match a rebuild after class moves."""
+    day = datetime(2026, 3, 2, 9, 30)
+    with app.app_context():
+        moved, stays = seeded['student_ids'][:2]
+        post_transactions([
+            {'user_id': sid, 'amount': amount, 'type': TransactionType.DEPOSIT, 'created_at': day}
+            for sid, amount in ((moved, 4), (stays, 6))
+        ])
+        db.session.commit()
+
+        db.session.get(User, moved).class_name = '6B'
+        db.session.commit()
+        assert _rollups() == {
+            (date(2026, 3, 2), '5A', TransactionType.DEPOSIT, 0): (1, 6),
+            (date(2026, 3, 2), '6B', TransactionType.DEPOSIT, 0): (1, 4),
+        }
+
+        db.session.get(User, stays).class_name = None
+        db.session.get(User, moved).class_name = '5A'
+        db.session.commit()
+        expected = _rollups()
+        assert expected == {
+            (date(2026, 3, 2), '5A', TransactionType.DEPOSIT, 0): (1, 4),
+            (date(2026, 3, 2), '', TransactionType.DEPOSIT, 0): (1, 6),
+        }
+        rebuild_rollups()
+        assert _rollups() == expected
@@ -0,0 +1,41 @@
+"""
+Unit tests for the scheduler leader lock.
+
+Verifies:
+- Only one holder of the lock file at a time
+- Leadership passes on once the holder releases
+"""
+from api.scheduler import LeaderLock
+
+
+def test_second_process_cannot_take_held_lock(tmp_path):
+    """A second lock on the same file fails while the first is held."""
+    path = str(tmp_path / 'scheduler.lock')
+    leader = LeaderLock(path)
+    follower = LeaderLock(path)
+    assert leader.try_acquire() is True
+    assert follower.try_acquire() is False
+    assert leader.held and not follower.held
+    leader.release()
+
+
+def test_follower_takes_over_after_release(tmp_path):
+    """Once the leader releases, a follower's next attempt succeeds."""
+    path = str(tmp_path / 'scheduler.lock')
+    leader = LeaderLock(path)
+    follower = LeaderLock(path)
+    leader.try_acquire()
+    assert follower.try_acquire() is False
+    leader.release()
+    assert follower.try_acquire() is True
+    assert leader.try_acquire() is False
+    follower.release()
+
+
+def test_try_acquire_is_reentrant(tmp_path):
+    """The leader can call try_acquire again without losing the lock."""
+    lock = LeaderLock(str(tmp_path / 'scheduler.lock'))
+    assert lock.try_acquire() is True
+    assert lock.try_acquire() is True
+    lock.release()
+    assert not lock.held
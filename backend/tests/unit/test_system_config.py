@@ -0,0 +1,49 @@
+"""
+Unit tests for cached SystemConfig reads.
+
+Verifies:
+- Reads within the check interval are served without queries
+- After the interval one stamp query revalidates; changes by other workers reload
+- set_many writes several keys and invalidates the snapshot at once
+"""
+from sqlalchemy import text
+
+from api import db
+from api.models import SystemConfig
+
+
+def test_reads_within_interval_skip_database(app, seeded, count_queries):
+    """Only the first read loads the table."""
+    with app.app_context():
+        assert SystemConfig.get('interest_rate') == '2.0'
+        with count_queries() as statements:
+            assert SystemConfig.get('raffle_prize_default') == '50'
+            assert SystemConfig.get('missing', 'fallback') == 'fallback'
+        assert statements == []
+
+
+def test_other_worker_change_seen_after_interval(app, seeded, count_queries):
+    """An unchanged stamp costs one query; a changed one reloads the snapshot."""
+    app.config['CONFIG_CACHE_CHECK_SECONDS'] = 0
+    with app.app_context():
+        assert SystemConfig.get('interest_rate') == '2.0'
+        with count_queries() as statements:
+            assert SystemConfig.get('interest_rate') == '2.0'
+        assert len(statements) == 1
+
+        # Written behind the ORM's back, as another worker process would
+        db.session.execute(text(
+            "UPDATE system_config SET value = '4.5', updated_at = '2099-01-01 00:00:00' WHERE key = 'interest_rate'"
+        ))
+        db.session.commit()
+        assert SystemConfig.get('interest_rate') == '4.5'
+
+
+def test_set_many_writes_all_keys_and_invalidates(app, seeded):
+    """New and existing keys are written together; readers see them immediately."""
+    with app.app_context():
+        assert SystemConfig.get('interest_rate') == '2.0'
+        SystemConfig.set_many({'interest_rate': '3.0', 'raffle_prize_default': '75', 'new_key': 'x'})
+        assert SystemConfig.get('interest_rate') == '3.0'
+        assert SystemConfig.get('raffle_prize_default') == '75'
+        assert SystemConfig.all_values()['new_key'] == ('x', None)
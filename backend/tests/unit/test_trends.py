@@ -0,0 +1,20 @@
+"""
+Unit tests for trend bucketing.
+
+Verifies:
+- Days, Monday-start weeks and configured terms (quarters as fallback)
+"""
+from datetime import date
+
+from api.services.trends import bucket_start
+
+
+def test_bucket_start_periods():
+    day = date(2026, 10, 15)  # A Thursday
+    assert bucket_start(day, 'day') == day
+    assert bucket_start(day, 'week') == date(2026, 10, 12)
+    assert bucket_start(day, 'term') == date(2026, 10, 1)
+    terms = [date(2026, 9, 2), date(2027, 1, 6)]
+    assert bucket_start(day, 'term', terms) == date(2026, 9, 2)
+    assert bucket_start(date(2027, 2, 1), 'term', terms) == date(2027, 1, 6)
+    assert bucket_start(date(2026, 8, 20), 'term', terms) == date(2026, 7, 1)  # Before the first term
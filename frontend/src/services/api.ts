@@ -38,9 +38,13 @@ export const studentsApi = {
 export const transactionsApi = {
     award: (studentId: number, behaviorId?: number, notes?: string) =>
         api.post('/transactions/award', { studentId, behaviorId, notes }),
+    awardBatch: (target: { studentIds: number[] } | { className: string }, behaviorId?: number, notes?: string) =>
+        api.post('/transactions/award/batch', { ...target, behaviorId, notes }),
     deposit: (studentId: number, amount: number, notes?: string) =>
         api.post('/transactions/deposit', { studentId, amount, notes }),
-    list: (params?: { user_id?: number; type?: string; limit?: number; offset?: number }) =>
+    importDeposits: (csv: Blob | string) =>
+        api.post('/transactions/deposit/import', csv, { headers: { 'Content-Type': 'text/csv' } }),
+    list: (params?: { user_id?: number; type?: string; limit?: number; cursor?: string; include_total?: boolean; offset?: number }) =>
         api.get('/transactions', { params }),
 };
 
@@ -80,18 +84,31 @@ export const analyticsApi = {
         api.get('/analytics/behavior-breakdown', { params: { days } }),
     systemStats: () =>
         api.get('/analytics/system-stats'),
+    trends: (params?: { period?: 'day' | 'week' | 'term'; start?: string; end?: string; class_name?: string; behavior_id?: number }) =>
+        api.get('/analytics/trends', { params }),
 };
 
 // Admin API
 export const adminApi = {
     getConfig: () =>
         api.get('/admin/config'),
-    updateConfig: (config: { interestRate?: string; rafflePrizeDefault?: string }) =>
+    updateConfig: (config: { interestRate?: string; rafflePrizeDefault?: string; termStartDates?: string }) =>
         api.put('/admin/config', config),
     listUsers: () =>
         api.get('/admin/users'),
     createUser: (data: { username: string; password: string; firstName: string; lastName: string; role: 'teacher' | 'admin' }) =>
         api.post('/admin/users', data),
-    triggerInterest: () =>
-        api.post('/admin/trigger-interest'),
+    triggerInterest: (dryRun?: boolean) =>
+        api.post('/admin/trigger-interest', { dryRun }),
+    listInterestRuns: (limit?: number) =>
+        api.get('/admin/interest-runs', { params: { limit } }),
+};
+
+// Live events (server-sent events; the browser reconnects automatically)
+export const eventsApi = {
+    open: (className?: string) =>
+        new EventSource(
+            `${API_BASE_URL}/events${className ? `?class_name=${encodeURIComponent(className)}` : ''}`,
+            { withCredentials: true }
+        ),
 };